@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import platform
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
+
+BENCHMARKS = ("login", "models", "commands", "events", "timestamps")
+
+
+def _version() -> str | None:
+    try:
+        return version("ewelink-api")
+    except PackageNotFoundError:
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("names", nargs="*", metavar="name", help=", ".join(BENCHMARKS))
+    parser.add_argument("-o", "--output", help="write the JSON report to a file")
+    args = parser.parse_args(argv)
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    results: dict[str, Any] = {}
+    for name in args.names or BENCHMARKS:
+        run = importlib.import_module(f"{__package__}.{name}").run
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = (
+            asyncio.run(run()) if inspect.iscoroutinefunction(run) else run()
+        )
+    report = {
+        "version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.time(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
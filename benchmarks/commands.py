@@ -0,0 +1,75 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+from ewelink import Power
+from ewelink.testing import FakeCloud
+
+from ._common import percentiles
+
+DEVICES = 100
+
+
+async def run(
+    round_trips: int = 1_000,
+    commands: int = 10_000,
+    window: int = 256,
+    sweep: int = 2_000,
+) -> dict[str, Any]:
+    async with FakeCloud(devices=DEVICES) as cloud:
+        client = cloud.client()
+        await client.login()
+        devices = list(client.devices)
+        samples = []
+        for index in range(round_trips):
+            device = devices[index % len(devices)]
+            start = time.perf_counter()
+            await device.edit(Power.on if index % 2 else Power.off)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        # Many commands in flight at once over the one WebSocket.
+        semaphore = asyncio.Semaphore(window)
+
+        async def send(index: int) -> None:
+            async with semaphore:
+                await devices[index % len(devices)].edit(
+                    Power.on if index % 2 else Power.off
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(index) for index in range(commands)))
+        elapsed = time.perf_counter() - start
+        await client.close()
+
+    async with FakeCloud(devices=sweep) as cloud:
+        client = cloud.client()
+        await client.login()
+        start = time.perf_counter()
+        results = [
+            result
+            async for result in client.bulk_edit(
+                {device.id: Power.off for device in client.devices}, window=window
+            )
+        ]
+        swept = time.perf_counter() - start
+        await client.close()
+    return {
+        "round_trip_ms": {"samples": round_trips, **percentiles(samples)},
+        "throughput": {
+            "commands": commands,
+            "window": window,
+            "seconds": elapsed,
+            "per_second": commands / elapsed,
+        },
+        "bulk_edit": {
+            "devices": len(results),
+            "window": window,
+            "seconds": swept,
+            "per_second": len(results) / swept,
+        },
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(run()), indent=2))
@@ -0,0 +1,45 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+from ewelink import Overflow
+from ewelink.testing import FakeCloud
+
+DEVICES = 1_000
+
+
+async def run(events: int = 20_000) -> dict[str, Any]:
+    async with FakeCloud(devices=DEVICES) as cloud:
+        # Blocking keeps every push, so the rate covers the full ingest path.
+        client = cloud.client(overflow=Overflow.BLOCK)
+        await client.login()
+        deviceids = list(cloud.devices)
+        received = 0
+        done = asyncio.Event()
+
+        def count(_: Any) -> None:
+            nonlocal received
+            received += 1
+            if received == events:
+                done.set()
+
+        client.ws.add_listener(count)
+        start = time.perf_counter()
+        for index in range(events):
+            await cloud.push(
+                deviceids[index % len(deviceids)],
+                {"switch": "on" if index % 2 else "off"},
+            )
+        await asyncio.wait_for(done.wait(), 60)
+        elapsed = time.perf_counter() - start
+        await client.close()
+    return {
+        "events": events,
+        "seconds": elapsed,
+        "per_second": events / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(run()), indent=2))
@@ -0,0 +1,34 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+from ewelink.testing import FakeCloud
+
+SIZES = (100, 1_000, 10_000)
+
+
+async def login(devices: int, page_size: int = 0) -> dict[str, Any]:
+    async with FakeCloud(devices=devices) as cloud:
+        client = cloud.client(page_size=page_size)
+        start = time.perf_counter()
+        await client.login()
+        elapsed = time.perf_counter() - start
+        await client.close()
+    return {
+        "devices": devices,
+        "page_size": page_size,
+        "seconds": elapsed,
+        "timings": client.timings,
+    }
+
+
+async def run(sizes: tuple[int, ...] = SIZES) -> dict[str, Any]:
+    return {
+        "login": [await login(size) for size in sizes],
+        "paged": [await login(size, page_size=500) for size in sizes],
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(run()), indent=2))
@@ -0,0 +1,40 @@
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any
+
+from ewelink.models import Device
+from ewelink.testing import FakeCloud
+
+DEVICES = 10_000
+
+
+def payloads(count: int) -> list[dict[str, Any]]:
+    return list(FakeCloud(devices=count).devices.values())
+
+
+def run(count: int = DEVICES, repeat: int = 5) -> dict[str, Any]:
+    best = float("inf")
+    for _ in range(repeat):
+        data = payloads(count)
+        start = time.perf_counter()
+        devices = [Device(payload, None) for payload in data]
+        best = min(best, time.perf_counter() - start)
+        del devices
+    data = payloads(count)
+    gc.collect()
+    tracemalloc.start()
+    devices = [Device(payload, None) for payload in data]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "devices": len(devices),
+        "seconds": best,
+        "us_per_device": best / count * 1e6,
+        "bytes_per_device": memory / count,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
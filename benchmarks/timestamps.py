@@ -0,0 +1,49 @@
+import json
+import random
+import timeit
+from datetime import UTC, datetime, timedelta
+
+from ewelink.utils import parse_timestamp
+
+DEVICES = 50_000
+
+
+def synthetic_timestamps(count: int = DEVICES) -> list[str]:
+    start = datetime(2018, 1, 1, tzinfo=UTC)
+    rng = random.Random(0)  # noqa: S311
+    return [
+        (
+            start
+            + timedelta(seconds=rng.randrange(10**8), milliseconds=rng.randrange(1000))
+        ).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+        + "Z"
+        # createdAt, onlineTime and offlineTime for every device
+        for _ in range(count * 3)
+    ]
+
+
+def strptime(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def run(count: int = DEVICES, repeat: int = 5) -> dict[str, float]:
+    values = synthetic_timestamps(count)
+    if any(
+        parse_timestamp(value) != strptime(value).replace(tzinfo=UTC)
+        for value in values[:1000]
+    ):
+        raise ValueError("parse_timestamp disagrees with strptime")
+    results = {
+        name: min(
+            timeit.repeat(
+                lambda f=f: [f(value) for value in values], number=1, repeat=repeat
+            )
+        )
+        for name, f in (("strptime", strptime), ("parse_timestamp", parse_timestamp))
+    }
+    results["speedup"] = results["strptime"] / results["parse_timestamp"]
+    return {"devices": count, "timestamps": len(values), **results}
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -1,18 +1,69 @@
 from dotenv import load_dotenv
 
 from . import utils
-from .client import Client, login
+from .client import Client, SyncResult, login
+from .codec import Codec
 from .constants import Constants as constants
-from .exceptions import DeviceOffline
+from .exceptions import (
+    APIError,
+    AuthenticationError,
+    CircuitOpen,
+    DeviceNotFound,
+    DeviceOffline,
+    EmailInactivated,
+    Forbidden,
+    ParameterError,
+    ServiceUnavailable,
+)
+from .gateway import Gateway, GatewayCache
+from .hooks import Hooks, OpenTelemetryHooks, PrometheusHooks
+from .http import Endpoints, PoolConfig
+from .lan import LanTransport
 from .models import DeviceChannelLengh, DeviceType, Object, Power
+from .pool import ClientPool
+from .ratelimit import Priority, RateLimiter, TokenBucket
+from .retry import CircuitBreaker, RetryPolicy
+from .store import CredentialStore, FileCredentialStore, MemoryCredentialStore
+from .ws import EditResult, EditStatus, Event, Overflow
 
 __all__ = (
+    "APIError",
+    "AuthenticationError",
+    "CircuitBreaker",
+    "CircuitOpen",
     "Client",
+    "ClientPool",
+    "Codec",
+    "CredentialStore",
     "DeviceChannelLengh",
+    "DeviceNotFound",
     "DeviceOffline",
     "DeviceType",
+    "EditResult",
+    "EditStatus",
+    "EmailInactivated",
+    "Endpoints",
+    "Event",
+    "FileCredentialStore",
+    "Forbidden",
+    "Gateway",
+    "GatewayCache",
+    "Hooks",
+    "LanTransport",
+    "MemoryCredentialStore",
     "Object",
+    "OpenTelemetryHooks",
+    "Overflow",
+    "ParameterError",
+    "PoolConfig",
     "Power",
+    "Priority",
+    "PrometheusHooks",
+    "RateLimiter",
+    "RetryPolicy",
+    "ServiceUnavailable",
+    "SyncResult",
+    "TokenBucket",
     "UnboundRegion",
     "constants",
     "login",
@@ -1,17 +1,28 @@
 import asyncio
-from dataclasses import dataclass
+import time
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import asdict, dataclass, field
 from functools import wraps
 from typing import Any, Callable, Coroutine, Type, TypeVar
 
-from .http import HttpClient
-from .models import ClientUser, Device, Devices, Region
+import aiohttp
+
+from .codec import Codec
+from .exceptions import APIError, AuthenticationError
+from .gateway import Gateway, GatewayCache
+from .hooks import Hooks
+from .http import Endpoints, HttpClient, PoolConfig
+from .lan import LanTransport
+from .models import ClientUser, Device, DeviceRegistry, Devices, Power, Region
+from .ratelimit import Priority, RateLimiter
+from .retry import RetryPolicy
 from .state import Connection
-from .ws import WebSocketClient
+from .store import CredentialStore
+from .ws import EditResult, Event, Overflow, WebSocketClient
 
 T = TypeVar("T")
 V = TypeVar("V")
 ClientT = TypeVar("ClientT", bound="Client")
-GatewayT = TypeVar("GatewayT", bound="Gateway")
 
 Decorator = Callable[
     [Callable[..., Coroutine[Any, Any, V]]], Callable[..., Coroutine[Any, Any, V]]
@@ -19,62 +30,307 @@ Decorator = Callable[
 
 
 @dataclass
-class Gateway:
-    domain: str
-    port: int | str
-
-    @classmethod
-    def from_dict(cls: Type[GatewayT], data: dict[str, str | int]) -> GatewayT:
-        return cls(domain=data.get("domain"), port=data.get("port"))
+class SyncResult:
+    added: list[Device] = field(default_factory=list)
+    removed: list[Device] = field(default_factory=list)
+    changed: dict[str, dict[str, Any]] = field(default_factory=dict)
 
 
 class Client:
     http: HttpClient
     gateway: Gateway | None = None
+    gateways: GatewayCache
+    lan: LanTransport | None
     ws: WebSocketClient | None
     user: ClientUser | None
+    reconnect: bool
+    replay: bool
+    store: CredentialStore | None
+    token_ttl: float
+    keep_data: bool
+    page_size: int
+    timings: dict[str, float]
     loop: asyncio.AbstractEventLoop
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         password: str,
         email: str | None = None,
         phone: str | int | None = None,
         *,
         region: str = "us",
+        reconnect: bool = True,
+        replay: bool = False,
+        queue_size: int = 1024,
+        workers: int = 1,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        coalesce: float = 0,
+        limiter: RateLimiter | None = None,
+        store: CredentialStore | None = None,
+        token_ttl: float = 29 * 24 * 3600,
+        session: aiohttp.ClientSession | None = None,
+        connector: aiohttp.BaseConnector | None = None,
+        pool: PoolConfig | None = None,
+        keep_data: bool = False,
+        codec: Codec | str = "auto",
+        page_size: int = 0,
+        retry: RetryPolicy | None = None,
+        gateway_ttl: float = 3600,
+        gateways: GatewayCache | None = None,
+        lan: LanTransport | None = None,
+        endpoints: Endpoints | None = None,
+        hooks: Hooks | None = None,
+        heartbeat: float | None = None,
+        pong_timeout: float = 5,
+        max_missed_pongs: int = 2,
     ):
         super().__init__()
         self.http = HttpClient(
-            password=password, email=email, phone=phone, region=region
+            password=password,
+            email=email,
+            phone=phone,
+            region=region,
+            limiter=limiter,
+            session=session,
+            connector=connector,
+            pool=pool,
+            codec=codec,
+            retry=retry,
+            endpoints=endpoints,
+            hooks=hooks,
         )
         self.ws = None
+        self.reconnect = reconnect
+        self.replay = replay
+        self._ws_options: dict[str, Any] = {
+            "queue_size": queue_size,
+            "workers": workers,
+            "overflow": overflow,
+            "coalesce": coalesce,
+            "limiter": limiter,
+            "heartbeat": heartbeat,
+            "pong_timeout": pong_timeout,
+            "max_missed_pongs": max_missed_pongs,
+        }
+        self.store = store
+        self.token_ttl = token_ttl
+        self.keep_data = keep_data
+        # Clients that share a cache also share the gateways found by dispatch.
+        self.gateways = gateways if gateways is not None else GatewayCache(gateway_ttl)
+        self.lan = lan
+        if lan is not None:
+            lan.http = self.http
+        self.page_size = page_size
         self.user = None
-        self._devices: dict[str, Device] = {}
+        self.timings = {}
+        self._devices = DeviceRegistry()
 
     async def login(self) -> None:
+        start = time.perf_counter()
+        self.timings = {}
         self.loop = asyncio.get_event_loop()
         await self.http._create_session(loop=self.loop)
-        self.user = ClientUser(data=await self.http.login(), http=self.http)
-        self.ws = WebSocketClient(http=self.http, user=self.user)
-        self.gateway = Gateway.from_dict(await self.http.get_gateway())
-        await self.ws.create_websocket(self.gateway.domain, self.gateway.port)
-        self._devices = {
-            device["deviceid"]: Device(data=device, state=self._get_state())
-            for device in (await self.http.get_devices()).get("devicelist", [])
-        }
+        devices: dict[str, Any] | None = None
+        if resumed := await self._resume():
+            user, devices = resumed
+        else:
+            user = await self.http.login()
+        self.timings["login"] = time.perf_counter() - start
+        self.user = ClientUser(data=user, http=self.http)
+        if (previous := self.ws) and not previous.closed:
+            await previous.close()
+        self.ws = WebSocketClient(
+            http=self.http,
+            user=self.user,
+            reconnect=self.reconnect,
+            replay=self.replay,
+            gateways=self.gateways,
+            **self._ws_options,
+        )
+        if previous is not None:
+            # Listeners and open events() streams carry over to the new socket.
+            self.ws._listeners = previous._listeners
+        # Only the login has to come first: the socket and the device list are
+        # independent, so models are built while the handshake is in flight.
+        # The registry is shared up front so pushes during the load apply.
         self.ws.set_devices(self._devices)
+        await asyncio.gather(self._connect(), self._load_devices(devices))
+        await self._save_credentials(user)
+        self.timings["total"] = time.perf_counter() - start
+
+    async def _connect(self) -> None:
+        start = time.perf_counter()
+        # Cached gateways are tried fastest first before asking for a new one.
+        for gateway in self.gateways.healthy():
+            try:
+                await self.ws.create_websocket(gateway.domain, gateway.port)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                continue
+            self.gateway = gateway
+            self.timings["websocket"] = time.perf_counter() - start
+            return
+        self.gateway = self.gateways.add(
+            Gateway.from_dict(await self.http.get_gateway())
+        )
+        self.timings["gateway"] = time.perf_counter() - start
+        await self.ws.create_websocket(self.gateway.domain, self.gateway.port)
+        self.timings["websocket"] = (
+            time.perf_counter() - start - self.timings["gateway"]
+        )
+
+    async def _load_devices(self, devices: dict[str, Any] | None) -> None:
+        start = time.perf_counter()
+        if devices is None:
+            devices = await self.http.get_devices(limit=self.page_size)
+        fetched = time.perf_counter()
+        self.timings["devices"] = fetched - start
+        await self._merge_devices(self.http.iter_devices(self.page_size, page=devices))
+        self.timings["models"] = time.perf_counter() - fetched
+
+    async def sync_devices(self) -> SyncResult:
+        return await self._merge_devices(self.http.iter_devices(self.page_size))
+
+    async def _merge_devices(
+        self, devicelist: AsyncIterator[dict[str, Any]]
+    ) -> SyncResult:
+        # Existing devices are updated in place so references stay valid.
+        state = self._get_state()
+        result = SyncResult()
+        seen: set[str] = set()
+        async for data in devicelist:
+            seen.add(data["deviceid"])
+            if (device := self._devices.get(data["deviceid"], None)) is None:
+                device = Device(data=data, state=state, keep_data=self.keep_data)
+                self._devices.add(device)
+                result.added.append(device)
+                continue
+            device._state = state
+            if self.keep_data:
+                device.data = data
+            if changes := device._sync(data):
+                self._devices.reindex(device)
+                result.changed[device.id] = changes
+        for id in [id for id in self._devices if id not in seen]:
+            result.removed.append(self._devices.remove(id))
+        await self._emit_sync(result)
+        return result
+
+    async def _emit_sync(self, result: SyncResult) -> None:
+        if self.ws is None:
+            return
+        for action, devices in (("added", result.added), ("removed", result.removed)):
+            for device in devices:
+                await self.ws.emit(
+                    Event(
+                        action=action,
+                        deviceid=device.id,
+                        params={},
+                        data={},
+                        device=device,
+                    )
+                )
+        for id, changes in result.changed.items():
+            await self.ws.emit(
+                Event(
+                    action="changed",
+                    deviceid=id,
+                    params=changes,
+                    data=changes,
+                    device=self._devices.get(id, None),
+                )
+            )
+
+    @property
+    def _store_key(self) -> str:
+        return str(self.http.email or self.http.phone)
+
+    async def _resume(self) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        if self.store is None:
+            return None
+        credentials = await self.store.load(self._store_key)
+        if not credentials or not credentials.get("at", None):
+            return None
+        self.http.set_region(credentials["region"])
+        self.http.token = credentials["at"]
+        self.http.refresh_token = credentials.get("rt", None)
+        # Entries written before "issued" existed carry the time as "saved".
+        issued = self.http.issued = (
+            credentials.get("issued", None) or credentials.get("saved", None) or 0
+        )
+        for gateway in credentials.get("gateways", None) or []:
+            self.gateways.add(Gateway.from_dict(gateway))
+        if time.time() - issued > self.token_ttl:
+            if not await self.http.refresh():
+                return None
+        try:
+            try:
+                devices = await self.http.get_devices(limit=self.page_size)
+            except AuthenticationError:
+                if not await self.http.refresh():
+                    return None
+                devices = await self.http.get_devices(limit=self.page_size)
+        except APIError:
+            return None
+        return credentials["user"], devices
+
+    async def _save_credentials(self, user: dict[str, Any]) -> None:
+        if self.store is None:
+            return
+        await self.store.save(
+            self._store_key,
+            {
+                "at": self.http.token,
+                "rt": self.http.refresh_token,
+                "region": self.http.region,
+                "apikey": user.get("apikey", None),
+                "gateways": [asdict(gateway) for gateway in self.gateways.gateways],
+                "user": user,
+                # Resuming keeps the original issue time instead of extending it.
+                "issued": self.http.issued,
+            },
+        )
+
+    async def close(self) -> None:
+        if self.ws and not self.ws.closed:
+            await self.ws.close()
+        await self.http.close()
 
     def _get_state(self) -> Connection:
         if self.ws is None:
             raise ValueError()  # TODO
-        return Connection(ws=self.ws, http=self.http)
+        return Connection(ws=self.ws, http=self.http, lan=self.lan)
+
+    def events(
+        self, *, action: str | None = None, deviceid: str | None = None
+    ) -> AsyncIterator[Event]:
+        if self.ws is None:
+            raise ValueError("Client is not logged in")
+        return self.ws.events(action=action, deviceid=deviceid)
+
+    def bulk_edit(
+        self,
+        edits: Mapping[str, Power | dict[str, Any]],
+        *,
+        window: int = 64,
+        priority: Priority = Priority.BULK,
+    ) -> AsyncIterator[EditResult]:
+        if self.ws is None:
+            raise ValueError("Client is not logged in")
+        return self.ws.bulk_update(
+            {
+                deviceid: params.to_dict() if isinstance(params, Power) else params
+                for deviceid, params in edits.items()
+            },
+            window=window,
+            priority=priority,
+        )
 
     def get_device(self, id: str) -> Device | None:
-        return self.devices.get(id)
+        return self._devices.get(id, None)
 
     @property
     def devices(self) -> Devices:
-        return Devices(self._devices.values())
+        return Devices(self._devices)
 
     @property
     def region(self) -> Region:
@@ -88,8 +344,11 @@ class Client:
         phone: str | int | None = None,
         *,
         region: str = "us",
+        **options: Any,
     ) -> Decorator:
-        return _build_login_decorator(cls(password, email, phone, region=region))
+        return _build_login_decorator(
+            cls(password, email, phone, region=region, **options)
+        )
 
 
 def login(
@@ -98,8 +357,11 @@ def login(
     phone: str | int | None = None,
     *,
     region: str = "us",
+    **options: Any,
 ) -> Decorator:
-    return _build_login_decorator(Client(password, email, phone, region=region))
+    return _build_login_decorator(
+        Client(password, email, phone, region=region, **options)
+    )
 
 
 def _build_login_decorator(client: Client) -> Decorator:
@@ -112,11 +374,7 @@ def _build_login_decorator(client: Client) -> Decorator:
                 await client.login()
                 return await f(*args, client, **kwargs)
             finally:
-                session = getattr(client.http, "session", None)
-                if session and not session.closed:
-                    await session.close()
-                if client.ws and not client.ws.closed:
-                    await client.ws.close()
+                await client.close()
 
         return wrapper
 
@@ -0,0 +1,37 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass(frozen=True, slots=True)
+class Codec:
+    name: str
+    dumps: Callable[[Any], str | bytes]
+    loads: Callable[[str | bytes], Any]
+
+    def encode(self, obj: Any) -> bytes:
+        data = self.dumps(obj)
+        return data if isinstance(data, bytes) else data.encode()
+
+    def encode_text(self, obj: Any) -> str:
+        data = self.dumps(obj)
+        return data if isinstance(data, str) else data.decode()
+
+
+STDLIB = Codec(name="json", dumps=json.dumps, loads=json.loads)
+
+
+def get_codec(codec: Codec | str = "auto") -> Codec:
+    if isinstance(codec, Codec):
+        return codec
+    if codec in ("auto", "orjson"):
+        try:
+            import orjson  # noqa: PLC0415
+        except ImportError:
+            if codec == "orjson":
+                raise
+        else:
+            return Codec(name="orjson", dumps=orjson.dumps, loads=orjson.loads)
+    if codec in ("auto", "json"):
+        return STDLIB
+    raise ValueError(f'Unknown codec "{codec}"')
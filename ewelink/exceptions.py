@@ -1,2 +1,62 @@
+from typing import Any
+
+from .constants import Constants as constants
+
+
 class DeviceOffline(Exception):
     pass
+
+
+class APIError(Exception):
+    code: int
+    data: dict[str, Any]
+
+    def __init__(self, code: int, data: dict[str, Any] | None = None) -> None:
+        self.code = code
+        self.data = data or {}
+        super().__init__(
+            constants.errors.get(code, constants.customErrors["unknown"]), code
+        )
+
+    @classmethod
+    def from_code(cls, code: int, data: dict[str, Any] | None = None) -> "APIError":
+        return _ERRORS.get(code, cls)(code, data)
+
+
+class ParameterError(APIError):
+    pass
+
+
+class AuthenticationError(APIError):
+    pass
+
+
+class EmailInactivated(APIError):
+    pass
+
+
+class Forbidden(APIError):
+    pass
+
+
+class DeviceNotFound(APIError):
+    pass
+
+
+class ServiceUnavailable(APIError):
+    pass
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+_ERRORS: dict[int, type[APIError]] = {
+    400: ParameterError,
+    401: AuthenticationError,
+    402: EmailInactivated,
+    403: Forbidden,
+    404: DeviceNotFound,
+    406: AuthenticationError,
+    503: ServiceUnavailable,
+}
@@ -0,0 +1,93 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Type, TypeVar
+
+GatewayT = TypeVar("GatewayT", bound="Gateway")
+
+
+@dataclass
+class Gateway:
+    domain: str
+    port: int | str
+    latency: float | None = field(default=None, compare=False)
+    failures: int = field(default=0, compare=False)
+    fetched: float = field(default_factory=time.time, compare=False)
+
+    @classmethod
+    def from_dict(cls: Type[GatewayT], data: dict[str, Any]) -> GatewayT:
+        return cls(
+            domain=data["domain"],
+            port=data["port"],
+            latency=data.get("latency", None),
+            failures=data.get("failures", 0),
+            fetched=data.get("fetched", None) or time.time(),
+        )
+
+
+class GatewayCache:
+    ttl: float
+    size: int
+    max_failures: int
+    gateways: list[Gateway]
+
+    def __init__(
+        self, ttl: float = 3600, *, size: int = 4, max_failures: int = 3
+    ) -> None:
+        self.ttl = ttl
+        self.size = size
+        self.max_failures = max_failures
+        self.gateways = []
+
+    def __len__(self) -> int:
+        return len(self.gateways)
+
+    def get(self, domain: str, port: int | str) -> Gateway | None:
+        for gateway in self.gateways:
+            if gateway.domain == domain and str(gateway.port) == str(port):
+                return gateway
+        return None
+
+    def add(self, gateway: Gateway) -> Gateway:
+        if (known := self.get(gateway.domain, gateway.port)) is not None:
+            known.fetched = gateway.fetched
+            return known
+        self.gateways.append(gateway)
+        if len(self.gateways) > self.size:
+            self.gateways.remove(self.candidates()[-1])
+        return gateway
+
+    def expire(self) -> None:
+        now = time.time()
+        self.gateways = [
+            gateway for gateway in self.gateways if now - gateway.fetched < self.ttl
+        ]
+
+    def candidates(self) -> list[Gateway]:
+        # Gateways without recent failures first, then the fastest; unmeasured
+        # ones sort first so that they get probed.
+        self.expire()
+        return sorted(
+            self.gateways,
+            key=lambda gateway: (gateway.failures, gateway.latency or 0),
+        )
+
+    def healthy(self) -> list[Gateway]:
+        return [
+            gateway
+            for gateway in self.candidates()
+            if gateway.failures < self.max_failures
+        ]
+
+    def best(self) -> Gateway | None:
+        return next(iter(self.healthy()), None)
+
+    def success(self, gateway: Gateway, latency: float) -> None:
+        gateway.failures = 0
+        gateway.latency = (
+            latency
+            if gateway.latency is None
+            else gateway.latency * 0.7 + latency * 0.3
+        )
+
+    def failure(self, gateway: Gateway) -> None:
+        gateway.failures += 1
@@ -0,0 +1,202 @@
+import time
+from typing import Any
+
+
+class Hooks:
+    """No-op instrumentation hooks; subclass and override what you need.
+
+    ``request_start`` may return a context object, which is passed back to
+    ``request_end`` for the same attempt.
+    """
+
+    def request_start(self, endpoint: str, method: str, attempt: int) -> Any:
+        return None
+
+    def request_end(
+        self,
+        endpoint: str,
+        context: Any,
+        *,
+        duration: float,
+        status: int | None,
+        error: BaseException | None,
+    ) -> None:
+        pass
+
+    def frame(self, direction: str, action: str | None, size: int) -> None:
+        pass
+
+    def reply(self, action: str, duration: float, outcome: str) -> None:
+        pass
+
+    def pending(self, count: int) -> None:
+        pass
+
+    def reconnect(self, success: bool, attempt: int) -> None:
+        pass
+
+    def heartbeat(self, rtt: float) -> None:
+        pass
+
+
+class PrometheusHooks(Hooks):
+    def __init__(self, registry: Any = None, *, namespace: str = "ewelink") -> None:
+        from prometheus_client import (  # noqa: PLC0415
+            REGISTRY,
+            Counter,
+            Gauge,
+            Histogram,
+        )
+
+        registry = registry or REGISTRY
+        self.requests = Counter(
+            "http_requests",
+            "HTTP requests",
+            ["endpoint", "status"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.request_seconds = Histogram(
+            "http_request_seconds",
+            "HTTP request duration",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.frames = Counter(
+            "ws_frames",
+            "WebSocket frames",
+            ["direction", "action"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.frame_bytes = Counter(
+            "ws_frame_bytes",
+            "WebSocket frame bytes",
+            ["direction"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.reply_seconds = Histogram(
+            "ws_reply_seconds",
+            "WebSocket reply latency",
+            ["action", "outcome"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.pending_requests = Gauge(
+            "ws_pending",
+            "WebSocket requests awaiting a reply",
+            namespace=namespace,
+            registry=registry,
+        )
+        self.reconnects = Counter(
+            "ws_reconnects",
+            "WebSocket reconnect attempts",
+            ["result"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.heartbeat_seconds = Histogram(
+            "ws_heartbeat_rtt_seconds",
+            "WebSocket heartbeat round trip",
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def request_end(
+        self,
+        endpoint: str,
+        context: Any,
+        *,
+        duration: float,
+        status: int | None,
+        error: BaseException | None,
+    ) -> None:
+        label = type(error).__name__ if error is not None else str(status)
+        self.requests.labels(endpoint, label).inc()
+        self.request_seconds.labels(endpoint).observe(duration)
+
+    def frame(self, direction: str, action: str | None, size: int) -> None:
+        self.frames.labels(direction, action or "reply").inc()
+        self.frame_bytes.labels(direction).inc(size)
+
+    def reply(self, action: str, duration: float, outcome: str) -> None:
+        self.reply_seconds.labels(action, outcome).observe(duration)
+
+    def pending(self, count: int) -> None:
+        self.pending_requests.set(count)
+
+    def reconnect(self, success: bool, attempt: int) -> None:
+        self.reconnects.labels("success" if success else "failure").inc()
+
+    def heartbeat(self, rtt: float) -> None:
+        self.heartbeat_seconds.observe(rtt)
+
+
+class OpenTelemetryHooks(Hooks):
+    def __init__(self, tracer: Any = None) -> None:
+        from opentelemetry import trace  # noqa: PLC0415
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("ewelink")
+
+    def request_start(self, endpoint: str, method: str, attempt: int) -> Any:
+        return self.tracer.start_span(
+            f"ewelink {endpoint}",
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={
+                "http.request.method": method,
+                "ewelink.endpoint": endpoint,
+                "ewelink.attempt": attempt,
+            },
+        )
+
+    def request_end(
+        self,
+        endpoint: str,
+        context: Any,
+        *,
+        duration: float,
+        status: int | None,
+        error: BaseException | None,
+    ) -> None:
+        if status is not None:
+            context.set_attribute("http.response.status_code", status)
+        if error is not None:
+            context.record_exception(error)
+            context.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        context.end()
+
+    def reply(self, action: str, duration: float, outcome: str) -> None:
+        # Replies are only known once they settle, so the span is backdated.
+        end = time.time_ns()
+        span = self.tracer.start_span(
+            f"ewelink ws {action}",
+            kind=self._trace.SpanKind.CLIENT,
+            start_time=end - int(duration * 1e9),
+            attributes={"ewelink.action": action, "ewelink.outcome": outcome},
+        )
+        if outcome != "ok":
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=end)
+
+    def reconnect(self, success: bool, attempt: int) -> None:
+        span = self.tracer.start_span(
+            "ewelink ws reconnect",
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={"ewelink.success": success, "ewelink.attempt": attempt},
+        )
+        if not success:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end()
+
+    def heartbeat(self, rtt: float) -> None:
+        end = time.time_ns()
+        span = self.tracer.start_span(
+            "ewelink ws heartbeat",
+            kind=self._trace.SpanKind.CLIENT,
+            start_time=end - int(rtt * 1e9),
+            attributes={"ewelink.rtt": rtt},
+        )
+        span.end(end_time=end)
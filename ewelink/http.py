@@ -2,15 +2,22 @@ import asyncio
 import base64
 import hashlib
 import hmac
-import json
 import re
 import time
 import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from typing import Any, TypedDict
+from urllib.parse import urlsplit
 
 import aiohttp
 
+from .codec import Codec, get_codec
 from .constants import Constants as constants
+from .exceptions import APIError
+from .hooks import Hooks
+from .ratelimit import Priority, RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
 from .utils import nonce
 
 CredentialsDict = TypedDict(
@@ -32,6 +39,32 @@ CredentialsDict = TypedDict(
 )
 
 
+@dataclass
+class PoolConfig:
+    # Open WebSockets hold their connection for their whole lifetime and count
+    # against these limits, so keep them above the number of sockets per host.
+    limit: int = 0
+    limit_per_host: int = 0
+    ttl_dns_cache: int | None = 300
+    keepalive_timeout: float = 30
+
+    def connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=self.ttl_dns_cache is not None,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+
+@dataclass(frozen=True)
+class Endpoints:
+    api: str = "https://{region}-api.coolkit.cc:8080/api"
+    dispatch: str = "https://{region}-dispa.coolkit.cc/dispatch/app"
+    websocket: str = "wss://{domain}:{port}/api/ws"
+
+
 class HttpClient:
     region: str
     email: str | None
@@ -39,34 +72,70 @@ class HttpClient:
     password: str
     token: str | None
     refresh_token: str | None
+    issued: float | None
     credentials: CredentialsDict | None
     sign: str | None
     loop: asyncio.AbstractEventLoop | None
     session: aiohttp.ClientSession | None
+    connector: aiohttp.BaseConnector | None
+    pool: PoolConfig
+    codec: Codec
+    endpoints: Endpoints
+    hooks: Hooks | None
+    limiter: RateLimiter | None
+    retry: RetryPolicy
+    breakers: dict[str, CircuitBreaker]
     BASE: str
 
     __slots__ = (
         "BASE",
+        "_owns_session",
+        "breakers",
+        "codec",
+        "connector",
         "credentials",
         "email",
+        "endpoints",
+        "hooks",
+        "issued",
+        "limiter",
         "loop",
         "password",
         "phone",
+        "pool",
         "refresh_token",
         "region",
+        "retry",
         "session",
         "sign",
         "token",
     )
 
-    def __init__(
+    def __init__(  # noqa: PLR0913, PLR0917
         self,
         password: str,
         email: str | None = None,
         phone: str | int | None = None,
         region: str = "us",
+        limiter: RateLimiter | None = None,
+        session: aiohttp.ClientSession | None = None,
+        connector: aiohttp.BaseConnector | None = None,
+        pool: PoolConfig | None = None,
+        codec: Codec | str = "auto",
+        retry: RetryPolicy | None = None,
+        endpoints: Endpoints | None = None,
+        hooks: Hooks | None = None,
     ) -> None:
-        self.session = None
+        self.session = session
+        self.hooks = hooks
+        self.endpoints = endpoints or Endpoints()
+        self.codec = get_codec(codec)
+        self._owns_session = session is None
+        self.connector = connector
+        self.pool = pool or PoolConfig()
+        self.limiter = limiter
+        self.retry = retry or RetryPolicy()
+        self.breakers = {}
         self.password = password
         self.credentials = None
         self.region = region
@@ -74,7 +143,8 @@ class HttpClient:
         self.sign = None
         self.token = None
         self.refresh_token = None
-        self.BASE = f"https://{region}-api.coolkit.cc:8080/api"
+        self.issued = None
+        self.set_region(region)
         self.email = email
         self.phone = phone
 
@@ -82,7 +152,108 @@ class HttpClient:
         self, loop: asyncio.AbstractEventLoop | None = None
     ) -> None:
         self.loop = loop or asyncio.get_event_loop()
-        self.session = aiohttp.ClientSession()
+        if self.session is not None and not self.session.closed:
+            return
+        if not self._owns_session:
+            raise RuntimeError("The shared session has been closed")
+        # A shared connector stays owned by the caller, a private one by us.
+        self.session = aiohttp.ClientSession(
+            connector=self.connector or self.pool.connector(),
+            connector_owner=self.connector is None,
+        )
+
+    async def close(self) -> None:
+        if self._owns_session and self.session and not self.session.closed:
+            await self.session.close()
+
+    def set_region(self, region: str) -> None:
+        self.region = region
+        self.BASE = self.endpoints.api.format(region=region)
+
+    async def _json(self, response: aiohttp.ClientResponse) -> Any:
+        return self.codec.loads(await response.read())
+
+    async def _throttle(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        if self.limiter:
+            await self.limiter.acquire(priority=priority)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: str,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        host = urlsplit(url).netloc
+        breaker = self.breakers.setdefault(
+            host, CircuitBreaker(self.retry.threshold, self.retry.reset)
+        )
+        timeout = aiohttp.ClientTimeout(total=self.retry.timeout_for(endpoint))
+        attempt = 0
+        while True:
+            breaker.check(host)
+            try:
+                await self._throttle(priority)
+                data = await self._attempt(
+                    method,
+                    url,
+                    endpoint=endpoint,
+                    attempt=attempt,
+                    timeout=timeout,
+                    **kwargs,
+                )
+            except (APIError, aiohttp.ClientError, TimeoutError) as error:
+                if not self.retry.retryable(error):
+                    breaker.success()
+                    raise
+                breaker.failure()
+                if attempt >= self.retry.retries:
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+            except BaseException:
+                # A cancelled trial request must not keep the circuit shut.
+                breaker.release()
+                raise
+            else:
+                breaker.success()
+                return data
+
+    async def _attempt(
+        self, method: str, url: str, *, endpoint: str, attempt: int, **kwargs: Any
+    ) -> dict[str, Any]:
+        if hooks := self.hooks:
+            context = hooks.request_start(endpoint, method, attempt)
+            start = time.perf_counter()
+        status: int | None = None
+        error: BaseException | None = None
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                status = response.status
+                if status in self.retry.statuses:
+                    raise APIError.from_code(status)
+                try:
+                    data: dict[str, Any] = await self._json(response)
+                except ValueError as exc:
+                    # Proxies and load balancers answer errors with HTML pages.
+                    raise APIError.from_code(status) from exc
+            if code := data.get("error", None):
+                raise APIError.from_code(code, data)
+            return data
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            if hooks:
+                hooks.request_end(
+                    endpoint,
+                    context,
+                    duration=time.perf_counter() - start,
+                    status=status,
+                    error=error,
+                )
 
     async def login(
         self, **kwargs: CredentialsDict | str | None
@@ -113,54 +284,121 @@ class HttpClient:
             self.credentials["phoneNumber"] = self.phone
         else:
             self.credentials["email"] = self.email
+        # The signature has to cover the exact bytes that are sent.
+        body = self.codec.encode(self.credentials)
         self.sign = (
             kwargs.get("sign", None)
             or base64.b64encode(
                 hmac.new(
-                    constants.APP_SECRET,
-                    msg=json.dumps(self.credentials).encode(),
-                    digestmod=hashlib.sha256,
+                    constants.APP_SECRET, msg=body, digestmod=hashlib.sha256
                 ).digest()
             ).decode()
         )
-        response = await self.session.post(
-            self.BASE + "/user/login",
-            headers={"Authorization": f"Sign {self.sign}"},
-            json=self.credentials,
-        )
-        data: dict[str, Any] = await response.json()
-        if "error" in data:
-            if region := data.get("region", None):
-                self.region = region
-                self.BASE = f"https://{region}-api.coolkit.cc:8080/api"
+        try:
+            data = await self._request(
+                "POST",
+                self.BASE + "/user/login",
+                endpoint="login",
+                headers={
+                    "Authorization": f"Sign {self.sign}",
+                    "Content-Type": "application/json",
+                },
+                data=body,
+            )
+        except APIError as error:
+            if region := error.data.get("region", None):
+                self.set_region(region)
                 return await self.login(credentials=self.credentials, sign=self.sign)
-            else:
-                print(data)
-        else:
-            self.token = data.get("at")
-            self.refresh_token = data.get("rt")
-            return data.get(
-                "user",
-                {"_id": "0", "clientInfo": {}, "createdAt": "1000-01-01T00:00:00.000Z"},
+            raise
+        self.token = data.get("at")
+        self.refresh_token = data.get("rt")
+        self.issued = time.time()
+        return data.get(
+            "user",
+            {"_id": "0", "clientInfo": {}, "createdAt": "1000-01-01T00:00:00.000Z"},
+        )
+
+    async def refresh(self) -> bool:
+        if not self.refresh_token:
+            return False
+        try:
+            data = await self._request(
+                "POST",
+                self.BASE + "/user/refresh",
+                endpoint="refresh",
+                headers={
+                    "Authorization": f"Bearer {self.token}",
+                    "Content-Type": "application/json",
+                },
+                data=self.codec.encode(
+                    {
+                        "rt": self.refresh_token,
+                        "appid": constants.APP_ID,
+                        "nonce": nonce(),
+                        "ts": int(time.time()),
+                        "version": 8,
+                    }
+                ),
             )
+        except APIError:
+            return False
+        if not data.get("at", None):
+            return False
+        self.token = data["at"]
+        self.refresh_token = data.get("rt", self.refresh_token)
+        self.issued = time.time()
+        return True
 
-    async def get_devices(self) -> dict[str, list[dict[str, str | int | Any]]]:
-        response = await self.session.get(
+    async def get_devices(
+        self, *, offset: int = 0, limit: int = 0
+    ) -> dict[str, list[dict[str, str | int | Any]]]:
+        params: dict[str, str | int] = {
+            "lang": "en",
+            "appid": constants.APP_ID,
+            "ts": int(time.time()),
+            "version": 8,
+            "getTags": 1,
+        }
+        if limit:
+            params |= {"beginIndex": offset, "num": limit}
+        return await self._request(
+            "GET",
             self.BASE + "/user/device",
-            params={
-                "lang": "en",
-                "appid": constants.APP_ID,
-                "ts": int(time.time()),
-                "version": 8,
-                "getTags": 1,
-            },
+            endpoint="devices",
+            priority=Priority.BULK,
+            params=params,
             headers={"Authorization": f"Bearer {self.token}"},
         )
-        return await response.json()
+
+    async def iter_devices(
+        self, limit: int = 0, *, page: dict[str, Any] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        # The next page is already in flight while the current one is consumed.
+        if page is None:
+            page = await self.get_devices(limit=limit)
+        offset = 0
+        pending: asyncio.Future[dict[str, Any]] | None = None
+        try:
+            while True:
+                devicelist: list[dict[str, Any]] = page.get("devicelist", None) or []
+                offset += len(devicelist)
+                if limit and len(devicelist) >= limit:
+                    pending = asyncio.ensure_future(
+                        self.get_devices(offset=offset, limit=limit)
+                    )
+                for device in devicelist:
+                    yield device
+                if pending is None:
+                    return
+                page, pending = await pending, None
+        finally:
+            if pending is not None:
+                pending.cancel()
 
     async def get_gateway(self) -> dict[str, Any]:
-        response = await self.session.get(
-            f"https://{self.region}-dispa.coolkit.cc/dispatch/app",
+        return await self._request(
+            "GET",
+            self.endpoints.dispatch.format(region=self.region),
+            endpoint="gateway",
             headers={"Authorization": f"Token {self.token}"},
         )
-        return await response.json()
@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import os
+import time
+from typing import Any
+
+import aiohttp
+
+from .codec import Codec
+from .exceptions import APIError
+from .http import HttpClient
+
+
+def _cipher(devicekey: str, iv: bytes) -> Any:
+    from cryptography.hazmat.primitives.ciphers import (  # noqa: PLC0415
+        Cipher,
+        algorithms,
+        modes,
+    )
+
+    key = hashlib.md5(devicekey.encode()).digest()  # noqa: S324
+    return Cipher(algorithms.AES(key), modes.CBC(iv))
+
+
+def encrypt(data: bytes, devicekey: str) -> tuple[str, str]:
+    from cryptography.hazmat.primitives.padding import PKCS7  # noqa: PLC0415
+
+    iv = os.urandom(16)
+    padder = PKCS7(128).padder()
+    encryptor = _cipher(devicekey, iv).encryptor()
+    padded = padder.update(data) + padder.finalize()
+    ciphertext = encryptor.update(padded) + encryptor.finalize()
+    return base64.b64encode(ciphertext).decode(), base64.b64encode(iv).decode()
+
+
+def decrypt(data: str, iv: str, devicekey: str) -> bytes:
+    from cryptography.hazmat.primitives.padding import PKCS7  # noqa: PLC0415
+
+    unpadder = PKCS7(128).unpadder()
+    decryptor = _cipher(devicekey, base64.b64decode(iv)).decryptor()
+    padded = decryptor.update(base64.b64decode(data)) + decryptor.finalize()
+    return unpadder.update(padded) + unpadder.finalize()
+
+
+class LanTransport:
+    http: HttpClient | None
+    port: int
+    timeout: float
+    cooldown: float
+    hosts: dict[str, tuple[str, int]]
+
+    def __init__(
+        self,
+        hosts: dict[str, str] | None = None,
+        *,
+        port: int = 8081,
+        timeout: float = 2,
+        cooldown: float = 60,
+    ) -> None:
+        self.http = None
+        self.port = port
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.hosts = {}
+        self._unreachable: dict[str, float] = {}
+        for deviceid, host in (hosts or {}).items():
+            self.add(deviceid, host)
+
+    def add(self, deviceid: str, host: str, port: int | None = None) -> None:
+        self.hosts[deviceid] = (host, port or self.port)
+        self._unreachable.pop(deviceid, None)
+
+    def remove(self, deviceid: str) -> None:
+        self.hosts.pop(deviceid, None)
+        self._unreachable.pop(deviceid, None)
+
+    def reachable(self, deviceid: str) -> bool:
+        if deviceid not in self.hosts or self.http is None:
+            return False
+        return self._unreachable.get(deviceid, 0) <= time.monotonic()
+
+    def _payload(
+        self, codec: Codec, deviceid: str, devicekey: str | None, params: dict[str, Any]
+    ) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "sequence": str(int(time.time() * 1000)),
+            "deviceid": deviceid,
+            "selfApikey": "123",
+            "data": params,
+        }
+        # Devices in DIY mode have no key and take the parameters in plain text.
+        if devicekey and devicekey != "0":
+            payload["data"], payload["iv"] = encrypt(codec.encode(params), devicekey)
+            payload["encrypt"] = True
+        return payload
+
+    async def send(
+        self, deviceid: str, devicekey: str | None, params: dict[str, Any]
+    ) -> dict[str, Any]:
+        http = self.http
+        if http is None or http.session is None:
+            raise RuntimeError("LanTransport is not attached to a logged in client")
+        host, port = self.hosts[deviceid]
+        command = next(
+            (name for name in ("switches", "switch") if name in params),
+            next(iter(params)),
+        )
+        try:
+            # Encrypted devices need cryptography, and a device that answers
+            # with something other than JSON is treated as unreachable too.
+            payload = self._payload(http.codec, deviceid, devicekey, params)
+            async with http.session.post(
+                f"http://{host}:{port}/zeroconf/{command}",
+                data=http.codec.encode(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as response:
+                data: dict[str, Any] = http.codec.loads(await response.read())
+        except (aiohttp.ClientError, TimeoutError, ValueError, ImportError):
+            self._unreachable[deviceid] = time.monotonic() + self.cooldown
+            raise
+        if code := data.get("error", None):
+            raise APIError.from_code(code, data)
+        return data
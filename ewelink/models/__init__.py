@@ -1,6 +1,5 @@
-from typing import Iterable
-
 from .device import Device
+from .devices import DeviceRegistry, Devices
 from .enumerations import DeviceChannelLengh, DeviceType, Power, Region
 from .object import Object
 from .user import ClientUser
@@ -8,21 +7,11 @@ from .user import ClientUser
 PowerState = Power
 
 
-class Devices(list[Device]):
-    def __init__(self, devices: Iterable[Device]):
-        super().__init__(devices)
-
-    def get(self, id: str) -> Device | None:
-        for device in self:
-            if device.id == id:
-                return device
-        return None
-
-
 __all__ = (
     "ClientUser",
     "Device",
     "DeviceChannelLengh",
+    "DeviceRegistry",
     "DeviceType",
     "Devices",
     "Object",
@@ -30,5 +19,3 @@ __all__ = (
     "PowerState",
     "Region",
 )
-
-del Iterable
@@ -2,10 +2,13 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Callable, Coroutine
 
+import aiohttp
+
 from ..customtypes import Subscriptable
-from ..exceptions import DeviceOffline
+from ..exceptions import APIError, DeviceOffline
+from ..ratelimit import Priority
 from ..state import Connection
-from ..utils import generics
+from ..utils import generics, parse_timestamp
 from .asset import Asset
 from .enumerations import DeviceType, Power
 from .object import Object
@@ -29,74 +32,217 @@ class Pulse:
     width: int
 
 
+_MISSING = object()
+
+
 class Device:
-    _state: Connection | None = None
-    online_time: datetime | None
-    offline_time: datetime | None
+    _state: Connection | None
+    state: Power
+    startup: Power
+    pulse: Pulse
+    version: int
+    data: dict[str, Any] | None
+
+    __slots__ = (
+        "_brand",
+        "_brand_logo",
+        "_brand_name",
+        "_created_at",
+        "_network",
+        "_offline_time",
+        "_online_time",
+        "_state",
+        "apikey",
+        "data",
+        "family_id",
+        "hash_id",
+        "id",
+        "key",
+        "location",
+        "name",
+        "online",
+        "params",
+        "pulse",
+        "room_id",
+        "startup",
+        "state",
+        "type",
+        "url",
+        "version",
+    )
 
     def __init__(
-        self, data: dict[str, str | int | Any], state: Connection | None
+        self,
+        data: dict[str, str | int | Any],
+        state: Connection | None,
+        *,
+        keep_data: bool = False,
     ) -> None:
         self.apikey: str | None = data.get("apikey", None)
         self.id: str = data.get("deviceid", "0")
-        self.brand: Brand = Brand(
-            name=data.get("brandName", None),
-            logo=Asset(
-                data.get("brandLogoUrl", None),
-                session=state.http.session if state else None,
-            ),
-        )
+        self._brand: Brand | None = None
+        self._brand_name: str | None = data.get("brandName", None)
+        self._brand_logo: str | None = data.get("brandLogoUrl", None)
         self.url: str | None = data.get("deviceUrl", None)
         self.hash_id: str = data.get("_id", "0")
-        self.created_at: datetime = datetime.strptime(
-            data["createdAt"], "%Y-%m-%dT%H:%M:%S.%fZ"
-        )
+        # Timestamps stay raw strings until they are first read.
+        self._created_at: datetime | str = data["createdAt"]
+        self._online_time: datetime | str | None = data.get("onlineTime", None)
+        self._offline_time: datetime | str | None = data.get("offlineTime", None)
         self.key: str = data.get("devicekey", "0")
         self.name: str | None = data.get("name", None)
-        self.online_time = None
-        self.offline_time = None
-        if online_time := data.get("onlineTime", None):
-            self.online_time = datetime.strptime(online_time, "%Y-%m-%dT%H:%M:%S.%fZ")
-        if offline_time := data.get("offlineTime", None):
-            self.offline_time = datetime.strptime(offline_time, "%Y-%m-%dT%H:%M:%S.%fZ")
         self.params: Object = Object(data["params"])
-        self.state: Power = (
-            Power[data["params"]["switches"][0]["switch"]]
-            if data["params"].get("switches", None)
-            else Power.unknown
-        )
-        self.startup: Power = (
-            Power[data["params"]["startup"]]
-            if data["params"].get("startup", None)
-            else Power.unknown
-        )
-        self.pulse: Pulse = Pulse(
-            state=Power[data["params"]["pulse"]]
-            if data["params"].get("pulse", None)
-            else Power.unknown,
-            width=data["params"].get("pulseWidth", 0),
-        )
-        self.network: Network = Network(
-            ssid=data["params"].get("ssid", None),
-            sta_mac=data["params"].get("staMac", None),
-        )
-        self.version: int = data["params"].get("version", 0)
+        self._network: Network | None = None
+        self.state = Power.unknown
+        self.startup = Power.unknown
+        self.pulse = Pulse(state=Power.unknown, width=0)
+        self.version = 0
+        self._load_params(data["params"])
         self.online: bool = data.get("online", False)
         self.location: str | None = (
             data.get("location") if data.get("location", None) else None
         )
-        self.data = data
+        family: dict[str, Any] = data.get("family", None) or {}
+        self.family_id: str | None = family.get("familyid", None)
+        self.room_id: str | None = family.get("roomid", None)
+        self.data = data if keep_data else None
         self._state = state
         self.type: DeviceType = DeviceType.__dict__["_value2member_map_"].get(
             int(data.get("type", 0), 16), 0
         )
 
+    @property
+    def brand(self) -> Brand:
+        if self._brand is None:
+            self._brand = Brand(
+                name=self._brand_name,
+                logo=Asset(
+                    self._brand_logo,
+                    session=self._state.http.session if self._state else None,
+                ),
+            )
+        return self._brand
+
+    @property
+    def created_at(self) -> datetime:
+        if isinstance(self._created_at, str):
+            self._created_at = parse_timestamp(self._created_at)
+        return self._created_at
+
+    @property
+    def online_time(self) -> datetime | None:
+        if isinstance(self._online_time, str):
+            self._online_time = parse_timestamp(self._online_time)
+        return self._online_time
+
+    @property
+    def offline_time(self) -> datetime | None:
+        if isinstance(self._offline_time, str):
+            self._offline_time = parse_timestamp(self._offline_time)
+        return self._offline_time
+
+    @property
+    def network(self) -> Network:
+        if self._network is None:
+            self._network = Network(
+                ssid=self.params.get("ssid", None),
+                sta_mac=self.params.get("staMac", None),
+            )
+        return self._network
+
+    def _load_params(self, params: dict[str, Any]) -> None:
+        if switches := params.get("switches", None):
+            self.state = Power[switches[0]["switch"]]
+        elif switch := params.get("switch", None):
+            self.state = Power[switch]
+        if startup := params.get("startup", None):
+            self.startup = Power[startup]
+        if pulse := params.get("pulse", None):
+            self.pulse.state = Power[pulse]
+        if "pulseWidth" in params:
+            self.pulse.width = params["pulseWidth"]
+        if self._network is not None:
+            if "ssid" in params:
+                self._network.ssid = params["ssid"]
+            if "staMac" in params:
+                self._network.sta_mac = params["staMac"]
+        if "version" in params:
+            self.version = params["version"]
+
+    def _sync(self, data: dict[str, Any]) -> dict[str, Any]:
+        changes: dict[str, Any] = {}
+        family: dict[str, Any] = data.get("family", None) or {}
+        for name, value in (
+            ("apikey", data.get("apikey", None)),
+            ("name", data.get("name", None)),
+            ("url", data.get("deviceUrl", None)),
+            ("key", data.get("devicekey", "0")),
+            ("online", data.get("online", False)),
+            ("location", data.get("location", None) or None),
+            ("family_id", family.get("familyid", None)),
+            ("room_id", family.get("roomid", None)),
+        ):
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changes[name] = value
+        brand = (data.get("brandName", None), data.get("brandLogoUrl", None))
+        if brand != (self._brand_name, self._brand_logo):
+            self._brand_name, self._brand_logo = brand
+            self._brand = None
+            changes["brand"] = brand[0]
+        for name, value in (
+            ("_online_time", data.get("onlineTime", None)),
+            ("_offline_time", data.get("offlineTime", None)),
+        ):
+            current = getattr(self, name)
+            if isinstance(current, datetime) and value is not None:
+                if current == parse_timestamp(value):
+                    continue
+            elif current == value:
+                continue
+            setattr(self, name, value)
+            changes[name[1:]] = value
+        params: dict[str, Any] = data.get("params", None) or {}
+        if delta := {
+            key: value
+            for key, value in params.items()
+            if self.params.get(key, _MISSING) != value
+        }:
+            self.update(delta)
+            changes["params"] = delta
+        return changes
+
+    def update(self, params: dict[str, Any]) -> None:
+        self.params.merge(params)
+        if "online" in params:
+            self.online = params["online"]
+        if "switches" in params:
+            params = {**params, "switches": self.params["switches"]}
+        self._load_params(params)
+
+    async def _send(self, params: dict[str, Any], priority: Priority) -> None:
+        if (lan := self._state.lan) is not None and lan.reachable(self.id):
+            try:
+                await lan.send(self.id, self.key, params)
+            except (
+                APIError,
+                aiohttp.ClientError,
+                TimeoutError,
+                ValueError,
+                ImportError,
+            ):
+                pass
+            else:
+                return
+        await self._state.ws.update_device_status(self.id, priority=priority, **params)
+
     async def edit(
         self,
         *states: Power,
         startup: Power | None = None,
         pulse: Pulse | Power | None = None,
         pulse_width: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
     ):
         try:
             _switch: dict[str, list[dict[str, str | int]] | str | int] = {}
@@ -107,7 +253,7 @@ class Device:
                         raise TypeError(
                             "The argument to states must either be single channel device command (eg: Power.on, Power.off) or atmost two multi-channel device command (eg: (Power.on[0, 1], Power.off[2, 3]) , Power.off[2, 3, 4])."
                         )
-                    _switch["switches"].append(_state["switches"])
+                    _switch["switches"].extend(_state["switches"])
                 else:
                     _switch.update(_state)
             params = {
@@ -120,7 +266,7 @@ class Device:
                 "pulseWidth": pulse_width or self.pulse.width,
             }
             params.update(_switch)
-            await self._state.ws.update_device_status(self.id, **params)
+            await self._send(params, priority)
         except DeviceOffline as offline:
             raise DeviceOffline(*offline.args) from offline
         else:
@@ -134,8 +280,8 @@ class Device:
                 self.pulse.state = pulse
             self.pulse.width = pulse_width or self.pulse.width
             if switches := _switch.get("switches", None):
-                if self.params.switches is not None:
-                    self.params.switches = switches
+                if "switches" in self.params:
+                    self.update({"switches": switches})
 
     @property
     def on(self) -> Subscriptable[int, Callable[[], Coroutine[None, Any, None]]]:
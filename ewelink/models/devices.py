@@ -0,0 +1,183 @@
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from itertools import islice
+from typing import TYPE_CHECKING, Any, overload
+
+from ..ratelimit import Priority
+from .device import Device
+from .enumerations import DeviceType, Power
+
+if TYPE_CHECKING:
+    from ..ws import EditResult
+
+_INDEXES: dict[str, Callable[[Device], Hashable]] = {
+    "type": lambda device: device.type,
+    "online": lambda device: device.online,
+    "brand": lambda device: device._brand_name,
+    "family": lambda device: device.family_id,
+    "room": lambda device: device.room_id,
+}
+
+
+class DeviceRegistry(Mapping[str, Device]):
+    def __init__(self, devices: Iterable[Device] = ()) -> None:
+        self._devices: dict[str, Device] = {}
+        self._indexes: dict[str, dict[Hashable, dict[str, Device]]] = {
+            name: {} for name in _INDEXES
+        }
+        self._keys: dict[str, dict[str, Hashable]] = {}
+        for device in devices:
+            self.add(device)
+
+    def __getitem__(self, id: str) -> Device:
+        return self._devices[id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._devices)
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def add(self, device: Device) -> None:
+        if device.id in self._devices:
+            self._unindex(device.id)
+        self._devices[device.id] = device
+        self._index(device)
+
+    def remove(self, id: str) -> Device | None:
+        if (device := self._devices.pop(id, None)) is not None:
+            self._unindex(id)
+        return device
+
+    def clear(self) -> None:
+        self._devices.clear()
+        self._keys.clear()
+        for index in self._indexes.values():
+            index.clear()
+
+    def reindex(self, device: Device) -> None:
+        keys = self._keys.get(device.id, None)
+        if keys is None:
+            return
+        for name, key in _INDEXES.items():
+            if (value := key(device)) != keys[name]:
+                self._drop(name, keys[name], device.id)
+                self._indexes[name].setdefault(value, {})[device.id] = device
+                keys[name] = value
+
+    def lookup(self, index: str, key: Hashable) -> list[Device]:
+        return list(self._indexes[index].get(key, {}).values())
+
+    def _index(self, device: Device) -> None:
+        keys = self._keys[device.id] = {}
+        for name, key in _INDEXES.items():
+            value = keys[name] = key(device)
+            self._indexes[name].setdefault(value, {})[device.id] = device
+
+    def _unindex(self, id: str) -> None:
+        for name, value in self._keys.pop(id, {}).items():
+            self._drop(name, value, id)
+
+    def _drop(self, name: str, value: Hashable, id: str) -> None:
+        bucket = self._indexes[name].get(value, None)
+        if bucket is not None:
+            bucket.pop(id, None)
+            if not bucket:
+                del self._indexes[name][value]
+
+
+class Devices:
+    __slots__ = ("_registry",)
+
+    def __init__(self, devices: DeviceRegistry | Iterable[Device]) -> None:
+        self._registry = (
+            devices if isinstance(devices, DeviceRegistry) else DeviceRegistry(devices)
+        )
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self._registry.values())
+
+    def __len__(self) -> int:
+        return len(self._registry)
+
+    def __contains__(self, item: object) -> bool:
+        if isinstance(item, Device):
+            return self._registry.get(item.id, None) is item
+        return item in self._registry
+
+    @overload
+    def __getitem__(self, key: str) -> Device: ...
+
+    @overload
+    def __getitem__(self, key: int) -> Device: ...
+
+    def __getitem__(self, key: str | int) -> Device:
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self._registry)
+            if not 0 <= key < len(self._registry):
+                raise IndexError("Devices index out of range")
+            return next(islice(self._registry.values(), key, None))
+        return self._registry[key]
+
+    def __repr__(self) -> str:
+        return f"Devices({list(self)!r})"
+
+    def edit_all(
+        self,
+        params: Power | dict[str, Any],
+        *,
+        window: int = 64,
+        priority: Priority = Priority.BULK,
+    ) -> AsyncIterator["EditResult"]:
+        state = next((device._state for device in self if device._state), None)
+        if state is None:
+            raise ValueError("Devices are not bound to a client")
+        params = params.to_dict() if isinstance(params, Power) else params
+        return state.ws.bulk_update(
+            {device.id: params for device in self},
+            window=window,
+            priority=priority,
+        )
+
+    def get(self, id: str) -> Device | None:
+        return self._registry.get(id, None)
+
+    def of_type(self, type: DeviceType) -> list[Device]:
+        return self._registry.lookup("type", type)
+
+    def online(self) -> list[Device]:
+        return self._registry.lookup("online", True)
+
+    def offline(self) -> list[Device]:
+        return self._registry.lookup("online", False)
+
+    def by_brand(self, name: str | None) -> list[Device]:
+        return self._registry.lookup("brand", name)
+
+    def in_family(self, family_id: str | None) -> list[Device]:
+        return self._registry.lookup("family", family_id)
+
+    def in_room(self, room_id: str | None) -> list[Device]:
+        return self._registry.lookup("room", room_id)
+
+    def filter(self, **criteria: Any) -> list[Device]:
+        """Return the devices matching every index criterion.
+
+        Keys are index names (``type``, ``online``, ``brand``, ``family``,
+        ``room``); the smallest matching bucket is scanned.
+        """
+        if not criteria:
+            return list(self)
+        buckets = sorted(
+            (self._registry.lookup(name, key) for name, key in criteria.items()),
+            key=len,
+        )
+        smallest, rest = buckets[0], [{d.id for d in b} for b in buckets[1:]]
+        return [d for d in smallest if all(d.id in ids for ids in rest)]
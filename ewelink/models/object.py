@@ -1,10 +1,62 @@
+from collections.abc import Iterator, MutableMapping
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from ..utils import merge_params
 
 
-class Object(BaseModel):
-    model_config = ConfigDict(extra="allow")
+class Object(MutableMapping[str, Any]):
+    __slots__ = ("_data",)
 
     def __init__(self, data: dict[str, Any] | None = None) -> None:
-        super().__init__(**(data or {}))
+        # Wraps the payload without copying it, so writes go to the same dict.
+        object.__setattr__(self, "_data", data if data is not None else {})
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_data":
+            raise AttributeError(name)
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._data[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        try:
+            del self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self._data.items())
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self) -> tuple[type["Object"], tuple[dict[str, Any]]]:
+        return type(self), (self._data,)
+
+    def __dir__(self) -> list[str]:
+        return [*super().__dir__(), *self._data]
+
+    def merge(self, delta: dict[str, Any]) -> None:
+        merge_params(self._data, delta)
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._data
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Any
 
 from ..http import HttpClient
+from ..utils import parse_timestamp
 from .enumerations import CountryCodes, Region
 from .object import Object
 
@@ -49,21 +50,15 @@ class ClientUser:
         ].get(data.get("countryCode", "0"), "0")
         self.online_time = None
         self.offline_time = None
-        self.created_at: datetime = datetime.strptime(
-            data["createdAt"], "%Y-%m-%dT%H:%M:%S.%fZ"
-        )
+        self.created_at: datetime = parse_timestamp(data["createdAt"])
         self.family_id: str | None = data.get("currentFamilyId", None)
         if extra := data.get("extra", None):
             if ip := extra.get("ipCountry", None):
                 self.ip_country: str = ip
         if online_time := data.get("onlineTime", None):
-            self.online_time: datetime = datetime.strptime(
-                online_time, "%Y-%m-%dT%H:%M:%S.%fZ"
-            )
+            self.online_time: datetime = parse_timestamp(online_time)
         if offline_time := data.get("offlineTime", None):
-            self.offline_time: datetime = datetime.strptime(
-                offline_time, "%Y-%m-%dT%H:%M:%S.%fZ"
-            )
+            self.offline_time: datetime = parse_timestamp(offline_time)
         self.online: bool = data.get("online", False)
         if location := data.get("location", None):
             self.location = location
@@ -0,0 +1,189 @@
+import asyncio
+import functools
+import threading
+from collections.abc import AsyncIterator
+from typing import Any, Callable, Coroutine, TypeVar
+
+import aiohttp
+
+from .client import Client
+from .gateway import GatewayCache
+from .http import PoolConfig
+from .models import Device, Power
+from .ws import Event
+
+T = TypeVar("T")
+
+# These objects are bound to one client and its event loop, so the pool takes
+# a factory for each and builds a separate instance for every client.
+_FACTORIES = ("hooks", "lan", "limiter")
+
+
+def _check_factories(options: dict[str, Any]) -> None:
+    for name in _FACTORIES:
+        if (factory := options.get(name, None)) is not None and not callable(factory):
+            raise TypeError(f'ClientPool takes a factory for "{name}", not an instance')
+
+
+class _Shard:
+    index: int
+    loop: asyncio.AbstractEventLoop
+    thread: threading.Thread
+    clients: dict[str, Client]
+    connector: aiohttp.BaseConnector | None
+    gateways: GatewayCache | None
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self._run, name=f"ewelink-shard-{index}", daemon=True
+        )
+        self.clients = {}
+        self.connector = None
+        self.gateways = None
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self) -> None:
+        if not self.thread.is_alive():
+            self.thread.start()
+
+    async def call(self, coro: Coroutine[Any, Any, T]) -> T:
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
+        )
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class ClientPool:
+    options: dict[str, Any]
+    pool: PoolConfig | None
+
+    def __init__(
+        self, shards: int = 1, *, pool: PoolConfig | None = None, **options: Any
+    ) -> None:
+        _check_factories(options)
+        self.options = options
+        self.pool = pool
+        self._shards = [_Shard(index) for index in range(max(shards, 1))]
+        self._accounts: dict[str, tuple[_Shard, tuple[Any, ...], dict[str, Any]]] = {}
+        self._index: dict[str, str] = {}
+        self._subscribers: set[
+            tuple[asyncio.AbstractEventLoop, asyncio.Queue[tuple[str, Event]]]
+        ] = set()
+
+    def add(
+        self,
+        password: str,
+        email: str | None = None,
+        phone: str | int | None = None,
+        **options: Any,
+    ) -> str:
+        _check_factories(options)
+        key = str(email or phone)
+        shard = self._shards[len(self._accounts) % len(self._shards)]
+        self._accounts[key] = (shard, (password, email, phone), options)
+        return key
+
+    async def start(self) -> None:
+        for shard in self._shards:
+            shard.start()
+        await asyncio.gather(
+            *(
+                shard.call(self._login(shard, key, args, options))
+                for key, (shard, args, options) in self._accounts.items()
+                if key not in shard.clients
+            )
+        )
+
+    async def _login(
+        self, shard: _Shard, key: str, args: tuple[Any, ...], options: dict[str, Any]
+    ) -> None:
+        # Runs on the shard loop, so the connector and client are bound to it.
+        if shard.connector is None:
+            shard.connector = (self.pool or PoolConfig()).connector()
+        options = self.options | options
+        # Clients on one shard share the gateways that dispatch returned.
+        if shard.gateways is None:
+            shard.gateways = GatewayCache(options.get("gateway_ttl", 3600))
+        options.setdefault("gateways", shard.gateways)
+        for name in _FACTORIES:
+            if (factory := options.get(name, None)) is not None:
+                options[name] = factory()
+        client = Client(*args, connector=shard.connector, **options)
+        await client.login()
+        if client.ws is not None:
+            client.ws.add_listener(functools.partial(self._forward, key))
+        shard.clients[key] = client
+        for deviceid in client._devices:
+            self._index[deviceid] = key
+
+    def _forward(self, key: str, event: Event) -> None:
+        if event.deviceid is not None:
+            if event.action == "added":
+                self._index[event.deviceid] = key
+            elif event.action == "removed" and self._index.get(event.deviceid) == key:
+                del self._index[event.deviceid]
+        for loop, queue in tuple(self._subscribers):
+            loop.call_soon_threadsafe(queue.put_nowait, (key, event))
+
+    async def events(self) -> AsyncIterator[tuple[str, Event]]:
+        queue: asyncio.Queue[tuple[str, Event]] = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def account(self, deviceid: str) -> str | None:
+        return self._index.get(deviceid, None)
+
+    def get_client(self, key: str) -> Client | None:
+        if account := self._accounts.get(key, None):
+            return account[0].clients.get(key, None)
+        return None
+
+    def get_device(self, deviceid: str) -> Device | None:
+        if (key := self.account(deviceid)) and (client := self.get_client(key)):
+            return client.get_device(deviceid)
+        return None
+
+    async def run(
+        self, deviceid: str, f: Callable[[Device], Coroutine[Any, Any, T]]
+    ) -> T:
+        if (device := self.get_device(deviceid)) is None:
+            raise KeyError(f'Device "{deviceid}" not found.')
+        return await self._accounts[self._index[deviceid]][0].call(f(device))
+
+    async def edit(self, deviceid: str, *states: Power, **kwargs: Any) -> None:
+        return await self.run(deviceid, lambda device: device.edit(*states, **kwargs))
+
+    async def close(self) -> None:
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                await shard.call(self._close(shard))
+                await asyncio.to_thread(shard.stop)
+
+    async def _close(self, shard: _Shard) -> None:
+        for client in shard.clients.values():
+            await client.close()
+        shard.clients.clear()
+        if shard.connector is not None:
+            await shard.connector.close()
+            shard.connector = None
+
+    async def __aenter__(self) -> "ClientPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -0,0 +1,105 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class TokenBucket:
+    rate: float
+    burst: float
+    tokens: float
+
+    __slots__ = ("_updated", "burst", "rate", "tokens")
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        self._refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    async def acquire(self) -> None:
+        while (delay := self.delay()) > 0:
+            await asyncio.sleep(delay)
+        self.take()
+
+
+class RateLimiter:
+    bucket: TokenBucket
+    device_rate: float | None
+    device_burst: float | None
+    acquired: dict[Priority, int]
+    queued_time: dict[Priority, float]
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        *,
+        device_rate: float | None = None,
+        device_burst: float | None = None,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.device_rate = device_rate
+        self.device_burst = device_burst
+        self.acquired = dict.fromkeys(Priority, 0)
+        self.queued_time = dict.fromkeys(Priority, 0.0)
+        self._devices: dict[str, TokenBucket] = {}
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._drain_task: asyncio.Task[None] | None = None
+
+    @property
+    def waiting(self) -> int:
+        return sum(not fut.done() for _, _, fut in self._waiters)
+
+    async def acquire(
+        self, deviceid: str | None = None, priority: Priority = Priority.INTERACTIVE
+    ) -> float:
+        start = time.monotonic()
+        if deviceid is not None and self.device_rate:
+            if (bucket := self._devices.get(deviceid, None)) is None:
+                bucket = self._devices[deviceid] = TokenBucket(
+                    self.device_rate, self.device_burst
+                )
+            await bucket.acquire()
+        if not self._waiters and not self.bucket.delay():
+            self.bucket.take()
+        else:
+            fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._counter), fut))
+            if self._drain_task is None or self._drain_task.done():
+                self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+            await fut
+        waited = time.monotonic() - start
+        self.acquired[priority] += 1
+        self.queued_time[priority] += waited
+        return waited
+
+    async def _drain(self) -> None:
+        while self._waiters:
+            await asyncio.sleep(self.bucket.delay())
+            while self._waiters:
+                _, _, fut = heapq.heappop(self._waiters)
+                if not fut.done():
+                    self.bucket.take()
+                    fut.set_result(None)
+                    break
@@ -0,0 +1,79 @@
+import random
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+
+import aiohttp
+
+from .exceptions import APIError, CircuitOpen
+
+
+@dataclass
+class RetryPolicy:
+    retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 10
+    timeout: float = 10
+    timeouts: dict[str, float] = field(default_factory=lambda: {"devices": 30})
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    threshold: int = 5
+    reset: float = 30
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))  # noqa: S311
+
+    def timeout_for(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, self.timeout)
+
+    def retryable(self, error: BaseException) -> bool:
+        if isinstance(error, APIError):
+            return error.code in self.statuses
+        return isinstance(error, (aiohttp.ClientError, TimeoutError))
+
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    threshold: int
+    reset: float
+    failures: int
+    state: BreakerState
+
+    __slots__ = ("_opened", "_trial", "failures", "reset", "state", "threshold")
+
+    def __init__(self, threshold: int = 5, reset: float = 30) -> None:
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.state = BreakerState.CLOSED
+        self._opened = 0.0
+        self._trial = False
+
+    def check(self, host: str) -> None:
+        if self.state is BreakerState.OPEN:
+            if time.monotonic() - self._opened < self.reset:
+                raise CircuitOpen(f'Circuit for "{host}" is open')
+            self.state = BreakerState.HALF_OPEN
+        elif self.state is BreakerState.HALF_OPEN and self._trial:
+            raise CircuitOpen(f'Circuit for "{host}" is waiting for a trial request')
+        # A half open circuit lets one trial request through until it resolves.
+        self._trial = self.state is BreakerState.HALF_OPEN
+
+    def release(self) -> None:
+        self._trial = False
+
+    def success(self) -> None:
+        self.failures = 0
+        self.state = BreakerState.CLOSED
+        self._trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.state is BreakerState.HALF_OPEN or self.failures >= self.threshold:
+            self.state = BreakerState.OPEN
+            self._opened = time.monotonic()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 from .http import HttpClient
+from .lan import LanTransport
 from .ws import WebSocketClient
 
 
@@ -8,3 +9,4 @@ from .ws import WebSocketClient
 class Connection:
     ws: WebSocketClient
     http: HttpClient
+    lan: LanTransport | None = None
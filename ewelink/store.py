@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import threading
+from abc import ABCMeta, abstractmethod
+from pathlib import Path
+from typing import Any
+
+Credentials = dict[str, Any]
+
+
+class CredentialStore(metaclass=ABCMeta):
+    @abstractmethod
+    async def load(self, key: str) -> Credentials | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save(self, key: str, credentials: Credentials) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryCredentialStore(CredentialStore):
+    def __init__(self) -> None:
+        self._credentials: dict[str, Credentials] = {}
+
+    async def load(self, key: str) -> Credentials | None:
+        return self._credentials.get(key, None)
+
+    async def save(self, key: str, credentials: Credentials) -> None:
+        self._credentials[key] = credentials
+
+    async def delete(self, key: str) -> None:
+        self._credentials.pop(key, None)
+
+
+class FileCredentialStore(CredentialStore):
+    path: Path
+
+    # Clients on other threads, such as ClientPool shards, may share the file.
+    _lock = threading.Lock()
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = Path(
+            path
+            or Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+            / "ewelink"
+            / "credentials.json"
+        )
+
+    def _read(self) -> dict[str, Credentials]:
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict[str, Credentials]) -> None:
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            suffix=".tmp", prefix=self.path.name, dir=self.path.parent
+        )
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(data, file)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    async def load(self, key: str) -> Credentials | None:
+        return self._read().get(key, None)
+
+    async def save(self, key: str, credentials: Credentials) -> None:
+        with self._lock:
+            data = self._read()
+            data[key] = credentials
+            self._write(data)
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
@@ -0,0 +1,358 @@
+import asyncio
+import contextlib
+import json
+import random
+import uuid
+from collections import Counter
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from .client import Client
+from .http import Endpoints
+from .utils import merge_params
+
+APIKEY = "00000000-0000-0000-0000-000000000000"
+
+
+class FakeCloud:
+    """In-process stand-in for the coolkit cloud.
+
+    Serves the REST login, refresh, device list and dispatch endpoints under a
+    ``/{region}`` prefix and the WebSocket protocol on ``/api/ws``, so a
+    ``Client`` built with ``endpoints`` talks to it instead of the real cloud.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        devices: int = 10,
+        *,
+        region: str = "us",
+        channels: int = 1,
+        latency: float = 0,
+        error_rate: float = 0,
+        push_rate: float = 0,
+        sysmsg_ratio: float = 0.1,
+        hb_interval: int = 145,
+        seed: int = 0,
+    ) -> None:
+        self.region = region
+        self.channels = channels
+        self.latency = latency
+        self.error_rate = error_rate
+        self.push_rate = push_rate
+        self.sysmsg_ratio = sysmsg_ratio
+        self.hb_interval = hb_interval
+        self.requests: Counter[str] = Counter()
+        self.tokens: set[str] = set()
+        self.refresh_tokens: set[str] = set()
+        self.devices: dict[str, dict[str, Any]] = {}
+        self.host = "127.0.0.1"
+        self.port = 0
+        self._random = random.Random(seed)  # noqa: S311
+        self._sockets: set[web.WebSocketResponse] = set()
+        self._stalled: set[web.WebSocketResponse] = set()
+        self._rejected = 0
+        self._runner: web.AppRunner | None = None
+        for index in range(devices):
+            self.add_device(index)
+
+    def _params(self) -> dict[str, Any]:
+        params: dict[str, Any] = {
+            "startup": "off",
+            "pulse": "off",
+            "pulseWidth": 500,
+            "version": 8,
+            "ssid": "fake",
+            "staMac": "00:00:00:00:00:00",
+        }
+        if self.channels > 1:
+            params["switches"] = [
+                {"switch": "off", "outlet": outlet} for outlet in range(self.channels)
+            ]
+        else:
+            params["switch"] = "off"
+        return params
+
+    def add_device(self, index: int) -> dict[str, Any]:
+        deviceid = f"1000{index:06x}"
+        device = self.devices[deviceid] = {
+            "_id": uuid.UUID(int=index).hex,
+            "deviceid": deviceid,
+            "name": f"Device {index}",
+            "apikey": APIKEY,
+            "type": "10",
+            "online": True,
+            "createdAt": "2020-01-01T00:00:00.000Z",
+            "onlineTime": "2020-01-01T00:00:00.000Z",
+            "offlineTime": "2020-01-01T00:00:00.000Z",
+            "devicekey": str(uuid.UUID(int=index + 1)),
+            "brandName": "SONOFF",
+            "brandLogoUrl": "",
+            "deviceUrl": "",
+            "location": "",
+            "family": {"familyid": "family", "roomid": f"room-{index % 8}"},
+            "params": self._params(),
+        }
+        return device
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def endpoints(self) -> Endpoints:
+        return Endpoints(
+            api=self.url + "/{region}/api",
+            dispatch=self.url + "/{region}/dispatch/app",
+            websocket="ws://{domain}:{port}/api/ws",
+        )
+
+    def client(
+        self,
+        password: str = "password",  # noqa: S107
+        email: str = "user@example.com",
+        **options: Any,
+    ) -> Client:
+        return Client(password, email, endpoints=self.endpoints, **options)
+
+    def application(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/{region}/api/user/login", self._login)
+        app.router.add_post("/{region}/api/user/refresh", self._refresh)
+        app.router.add_get("/{region}/api/user/device", self._devices)
+        app.router.add_get("/{region}/dispatch/app", self._dispatch)
+        app.router.add_get("/api/ws", self._websocket)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._runner = web.AppRunner(self.application())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.host, self.port = self._runner.addresses[0][:2]
+
+    async def close(self) -> None:
+        await self.drop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def drop(self) -> None:
+        for ws in tuple(self._sockets):
+            await ws.close()
+
+    def stall(self) -> None:
+        # Open sockets stop answering, like a half-open TCP connection.
+        self._stalled.update(self._sockets)
+
+    def resume(self) -> None:
+        # Requests that arrived while stalled stay unanswered.
+        self._stalled.clear()
+
+    def reject(self, count: int = 1) -> None:
+        # The next sockets are closed right after the upgrade.
+        self._rejected += count
+
+    def expire_tokens(self) -> None:
+        self.tokens.clear()
+
+    async def push(
+        self, deviceid: str, params: dict[str, Any], action: str = "update"
+    ) -> None:
+        device = self.devices[deviceid]
+        if action == "sysmsg":
+            device["online"] = params.get("online", device["online"])
+        else:
+            merge_params(device["params"], params)
+        message = json.dumps(
+            {
+                "action": action,
+                "deviceid": deviceid,
+                "apikey": APIKEY,
+                "userAgent": "device",
+                "params": params,
+            }
+        )
+        await self.broadcast(message)
+
+    async def broadcast(self, message: str) -> None:
+        for ws in tuple(self._sockets - self._stalled):
+            if not ws.closed:
+                with contextlib.suppress(ConnectionResetError):
+                    await ws.send_str(message)
+
+    async def _delay(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _failed(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def _authorized(self, request: web.Request) -> bool:
+        _, _, token = request.headers.get("Authorization", "").partition(" ")
+        return token in self.tokens
+
+    def _issue(self) -> dict[str, str]:
+        at, rt = uuid.uuid4().hex, uuid.uuid4().hex
+        self.tokens.add(at)
+        self.refresh_tokens.add(rt)
+        return {"at": at, "rt": rt}
+
+    async def _login(self, request: web.Request) -> web.Response:
+        self.requests["login"] += 1
+        await self._delay()
+        if self._failed():
+            return web.Response(status=503)
+        if request.match_info["region"] != self.region:
+            return web.json_response({"error": 301, "region": self.region})
+        credentials = await request.json()
+        return web.json_response(
+            {
+                **self._issue(),
+                "region": self.region,
+                "user": {
+                    "_id": "user",
+                    "email": credentials.get("email", None),
+                    "apikey": APIKEY,
+                    "clientInfo": {},
+                    "createdAt": "2020-01-01T00:00:00.000Z",
+                },
+            }
+        )
+
+    async def _refresh(self, request: web.Request) -> web.Response:
+        self.requests["refresh"] += 1
+        await self._delay()
+        rt = (await request.json()).get("rt", None)
+        if rt not in self.refresh_tokens:
+            return web.json_response({"error": 401})
+        self.refresh_tokens.discard(rt)
+        return web.json_response({"error": 0, **self._issue()})
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        self.requests["devices"] += 1
+        await self._delay()
+        if self._failed():
+            return web.Response(status=503)
+        if not self._authorized(request):
+            return web.json_response({"error": 406})
+        devicelist = list(self.devices.values())
+        if "num" in request.query:
+            offset = int(request.query.get("beginIndex", 0))
+            devicelist = devicelist[offset : offset + int(request.query["num"])]
+        return web.json_response({"error": 0, "devicelist": devicelist})
+
+    async def _dispatch(self, request: web.Request) -> web.Response:
+        self.requests["dispatch"] += 1
+        await self._delay()
+        if self._failed():
+            return web.Response(status=503)
+        return web.json_response(
+            {"error": 0, "reason": "ok", "domain": self.host, "port": self.port}
+        )
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        self.requests["websocket"] += 1
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        if self._rejected:
+            self._rejected -= 1
+            await ws.close()
+            return ws
+        self._sockets.add(ws)
+        pusher: asyncio.Task[None] | None = None
+        try:
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT or ws in self._stalled:
+                    continue
+                if message.data == "ping":
+                    self.requests["ping"] += 1
+                    await ws.send_str("pong")
+                    continue
+                data: dict[str, Any] = json.loads(message.data)
+                reply = await self._handle(data)
+                # The client may have gone away while the reply was delayed.
+                if ws.closed:
+                    break
+                await ws.send_str(json.dumps(reply))
+                if (
+                    data.get("action") == "userOnline"
+                    and not reply["error"]
+                    and self.push_rate
+                    and pusher is None
+                ):
+                    pusher = asyncio.create_task(self._pusher())
+        except ConnectionResetError:
+            pass
+        finally:
+            self._sockets.discard(ws)
+            self._stalled.discard(ws)
+            if pusher is not None:
+                pusher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pusher
+        return ws
+
+    async def _handle(self, data: dict[str, Any]) -> dict[str, Any]:
+        action = data.get("action", None)
+        self.requests[action] += 1
+        await self._delay()
+        reply: dict[str, Any] = {"error": 0, "sequence": data.get("sequence", None)}
+        if action == "userOnline":
+            if data.get("at", None) not in self.tokens:
+                return reply | {"error": 406}
+            return reply | {
+                "apikey": APIKEY,
+                "config": {"hb": 1, "hbInterval": self.hb_interval},
+            }
+        device = self.devices.get(data.get("deviceid", None), None)
+        if device is None:
+            return reply | {"error": 404}
+        reply |= {"deviceid": device["deviceid"], "apikey": APIKEY}
+        if not device["online"]:
+            return reply | {"error": 503}
+        if self._failed():
+            return reply | {"error": 500}
+        if action == "update":
+            merge_params(device["params"], data.get("params", None) or {})
+        elif action == "query":
+            keys = data.get("params", None) or list(device["params"])
+            reply["params"] = {
+                key: device["params"][key] for key in keys if key in device["params"]
+            }
+        return reply
+
+    async def _pusher(self) -> None:
+        while True:
+            await asyncio.sleep(1 / self.push_rate)
+            deviceid = self._random.choice(list(self.devices))
+            device = self.devices[deviceid]
+            if self._random.random() < self.sysmsg_ratio:
+                await self.push(deviceid, {"online": not device["online"]}, "sysmsg")
+            elif not device["online"]:
+                continue
+            elif "switches" in device["params"]:
+                outlet = self._random.randrange(self.channels)
+                switch = device["params"]["switches"][outlet]["switch"]
+                await self.push(
+                    deviceid,
+                    {
+                        "switches": [
+                            {
+                                "switch": "off" if switch == "on" else "on",
+                                "outlet": outlet,
+                            }
+                        ]
+                    },
+                )
+            else:
+                switch = device["params"]["switch"]
+                await self.push(deviceid, {"switch": "off" if switch == "on" else "on"})
+
+    async def __aenter__(self) -> "FakeCloud":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
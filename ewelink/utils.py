@@ -1,6 +1,7 @@
 import asyncio
 import secrets
 import string
+from datetime import UTC, datetime
 from typing import Any, Callable, Coroutine, TypeVar
 
 T = TypeVar("T")
@@ -14,6 +15,33 @@ def nonce(length: int = 8) -> str:
     return "".join(secrets.choice(_ALPHABET) for _ in range(length))
 
 
+def parse_timestamp(value: str) -> datetime:
+    # fromisoformat handles the API's "...T00:00:00.000Z" form natively and is
+    # an order of magnitude faster than strptime.
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=UTC)
+    return timestamp.astimezone(UTC)
+
+
+def merge_switches(
+    current: list[dict[str, Any]] | None, new: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    merged = {switch["outlet"]: switch for switch in current or []}
+    merged.update((switch["outlet"], switch) for switch in new)
+    return [merged[outlet] for outlet in sorted(merged)]
+
+
+def merge_params(current: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    for name, value in new.items():
+        current[name] = (
+            merge_switches(current["switches"], value)
+            if name == "switches" and "switches" in current
+            else value
+        )
+    return current
+
+
 def main(*args: Any, **kwargs: Any) -> Callable[[Callback], T]:
     def decorator(f: Callback) -> T:
         return asyncio.get_event_loop().run_until_complete(f(*args, **kwargs))
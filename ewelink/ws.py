@@ -1,20 +1,37 @@
 import asyncio
+import inspect
+import random
 import time
-from typing import Any, AnyStr, TypedDict
+from collections.abc import AsyncIterator, Callable, Mapping
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AnyStr, Protocol, TypedDict
 
 import aiohttp
 
 from .constants import Constants as constants
-from .exceptions import DeviceOffline
+from .exceptions import APIError, CircuitOpen, DeviceOffline
+from .gateway import Gateway, GatewayCache
 from .http import HttpClient
 from .models.user import ClientUser
-from .utils import nonce
+from .ratelimit import Priority, RateLimiter
+from .utils import merge_params, nonce
 
 
 class DeviceInterface:
     id: str
     online: bool
 
+    def update(self, params: dict[str, Any]) -> None: ...
+
+
+class DeviceMap(Protocol):
+    def __len__(self) -> int: ...
+
+    def get(self, id: str, default: Any = None) -> DeviceInterface | None: ...
+
+    def reindex(self, device: DeviceInterface) -> None: ...
+
 
 Response = TypedDict(
     "Response",
@@ -28,31 +45,199 @@ Response = TypedDict(
 )
 
 
+@dataclass
+class Event:
+    action: str
+    deviceid: str | None
+    params: dict[str, Any]
+    data: dict[str, Any] = field(repr=False)
+    device: DeviceInterface | None = None
+
+
+Listener = Callable[[Event], Any]
+
+
+@dataclass
+class _Batch:
+    params: dict[str, Any]
+    future: "asyncio.Future[Response]"
+    priority: Priority
+
+
+class Overflow(Enum):
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    BLOCK = "block"
+
+
+class EditStatus(Enum):
+    SUCCESS = "success"
+    OFFLINE = "offline"
+    TIMEOUT = "timeout"
+    ERROR = "error"
+
+
+@dataclass
+class EditResult:
+    deviceid: str
+    status: EditStatus
+    response: Response | None = None
+    error: BaseException | None = None
+
+
+def _outcome(fut: asyncio.Future[Response], timed_out: bool) -> str:
+    if timed_out or not fut.done():
+        return "timeout"
+    if fut.cancelled():
+        return "cancelled"
+    if isinstance(error := fut.exception(), DeviceOffline):
+        return "offline"
+    return "error" if error or fut.result().get("error") else "ok"
+
+
 class WebSocketClient:
     http: HttpClient
-    heartbeat: int
+    heartbeat: float
+    pong_timeout: float
+    max_missed_pongs: int
+    missed_pongs: int
     ws: aiohttp.ClientWebSocketResponse | None
     session: aiohttp.ClientSession
     user: ClientUser
-    devices: dict[str, DeviceInterface]
+    devices: DeviceMap | None
+    timeout: float
+    reconnect: bool
+    replay: bool
+    max_retries: int | None
+    backoff: float
+    max_backoff: float
+    domain: str | None
+    port: int | str | None
+    reconnects: int
+    limiter: RateLimiter | None
+    gateways: GatewayCache | None
+    coalesce: float
+    coalesce_windows: dict[str, float]
+    overflow: Overflow
+    dropped: int
+    coalesced: int
+    rtt: float | None
+    srtt: float | None
     _ping_task: asyncio.Task[None] | None = None
     _poll_task: asyncio.Task[None] | None = None
 
-    def __init__(self, http: HttpClient, user: ClientUser) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        http: HttpClient,
+        user: ClientUser,
+        *,
+        timeout: float = 10,
+        reconnect: bool = True,
+        replay: bool = False,
+        max_retries: int | None = None,
+        backoff: float = 1,
+        max_backoff: float = 60,
+        queue_size: int = 1024,
+        workers: int = 1,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        coalesce: float = 0,
+        limiter: RateLimiter | None = None,
+        gateways: GatewayCache | None = None,
+        heartbeat: float | None = None,
+        pong_timeout: float = 5,
+        max_missed_pongs: int = 2,
+    ) -> None:
         self.http = http
         self.user = user
-        self.devices = []
-        self.heartbeat = 90
+        self.devices = None
+        # A fixed heartbeat overrides the interval suggested by the server.
+        self.heartbeat = heartbeat or 90
+        self._fixed_heartbeat = heartbeat is not None
+        self.pong_timeout = pong_timeout
+        self.max_missed_pongs = max_missed_pongs
+        self.missed_pongs = 0
+        self._pong_received = asyncio.Event()
+        self.timeout = timeout
+        self.reconnect = reconnect
+        self.replay = replay
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
         self.session = http.session
         self.ws = None
-        self._futures: dict[str, list[asyncio.Future[Response]]] = {"update": []}
+        self.domain = None
+        self.port = None
+        self.reconnects = 0
+        self.rtt = None
+        self.srtt = None
+        self._ping_sent = 0.0
+        self._pending: dict[str, asyncio.Future[Response]] = {}
+        self._replay: dict[str, dict[str, Any]] = {}
+        self._last_sequence = 0
+        self._connected = asyncio.Event()
+        self._closing = False
+        self._listeners: dict[tuple[str | None, str | None], list[Listener]] = {}
+        self.overflow = overflow
+        self.dropped = 0
+        self.coalesced = 0
+        self._inbox: asyncio.Queue[dict[str, Any]] = asyncio.Queue(queue_size)
+        self._queued: dict[tuple[str, str | None], dict[str, Any]] = {}
+        self._worker_count = workers
+        self._workers: list[asyncio.Task[None]] = []
+        self.coalesce = coalesce
+        self.coalesce_windows = {}
+        self._batches: dict[str, _Batch] = {}
+        self.limiter = limiter
+        self.gateways = gateways
 
-    def set_devices(self, devices: dict[str, DeviceInterface]):
+    def set_devices(self, devices: DeviceMap) -> None:
         self.devices = devices
 
     async def create_websocket(self, domain: str, port: int | str) -> None:
-        self.ws = await self.session.ws_connect(f"wss://{domain}:{port}/api/ws")
-        await self.ws.send_json(
+        self.domain, self.port = domain, port
+        await self._connect()
+        self._ping_task = self.http.loop.create_task(self.ping_hb())
+        self._workers = [
+            self.http.loop.create_task(self._work()) for _ in range(self._worker_count)
+        ]
+        self._poll_task = self.http.loop.create_task(self.poll_event())
+
+    async def _connect(self) -> dict[str, Any]:
+        gateway = self.gateways.get(self.domain, self.port) if self.gateways else None
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                response = await self._handshake()
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+            if gateway is not None:
+                self.gateways.failure(gateway)
+            # The upgrade may have succeeded before the handshake failed.
+            if self.ws is not None and not self.ws.closed:
+                await self.ws.close()
+            raise
+        if gateway is not None:
+            if response.get("error"):
+                self.gateways.failure(gateway)
+            else:
+                self.gateways.success(gateway, time.perf_counter() - start)
+        return response
+
+    async def _select_gateway(self) -> None:
+        if (gateway := self.gateways.best()) is None:
+            try:
+                gateway = self.gateways.add(
+                    Gateway.from_dict(await self.http.get_gateway())
+                )
+            except (APIError, CircuitOpen, aiohttp.ClientError, asyncio.TimeoutError):
+                return
+        self.domain, self.port = gateway.domain, gateway.port
+
+    async def _handshake(self) -> dict[str, Any]:
+        self.ws = await self.session.ws_connect(
+            self.http.endpoints.websocket.format(domain=self.domain, port=self.port),
+            timeout=aiohttp.ClientWSTimeout(ws_close=self.pong_timeout),
+        )
+        await self._send(
             {
                 "action": "userOnline",
                 "version": 8,
@@ -62,100 +247,509 @@ class WebSocketClient:
                 "apikey": self.user.api_key,
                 "appid": constants.APP_ID,
                 "nonce": nonce(),
-                "sequence": str(time.time() * 1000),
+                "sequence": self._next_sequence(),
             }
         )
-        response: dict[str, str | int | dict[str, int]] = await self.ws.receive_json()
+        try:
+            response: dict[str, str | int | dict[str, int]] = self.http.codec.loads(
+                await self.ws.receive_str()
+            )
+        except (aiohttp.WSMessageTypeError, ValueError) as error:
+            # The gateway accepted the upgrade but closed or sent no valid reply.
+            raise ConnectionError("Invalid userOnline response") from error
         if not response.get("error"):
-            if config := response.get("config", {}):
+            self.missed_pongs = 0
+            if (config := response.get("config", {})) and not self._fixed_heartbeat:
                 if isinstance(config, dict):
                     if hb_interval := response["config"].get("hbInterval", ""):
                         if isinstance(hb_interval, int):
                             self.heartbeat = hb_interval + 7
-        self._ping_task = self.http.loop.create_task(self.ping_hb())
-        self._poll_task = self.http.loop.create_task(self.poll_event())
+            self._connected.set()
+        return response
 
-    async def update_device_status(
-        self, deviceid: str, **kwargs: list[dict[str, AnyStr]] | AnyStr
+    async def _send(self, payload: dict[str, Any]) -> None:
+        text = self.http.codec.encode_text(payload)
+        if hooks := self.http.hooks:
+            hooks.frame("out", payload.get("action", None), len(text))
+        await self.ws.send_str(text)
+
+    async def _reconnect(self) -> bool:
+        delay = self.backoff
+        attempts = 0
+        while not self._closing and not self.session.closed:
+            if self.ws and not self.ws.closed:
+                await self.ws.close()
+            if self.gateways is not None:
+                await self._select_gateway()
+            try:
+                response = await self._connect()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                response = {"error": -1}
+            if hooks := self.http.hooks:
+                hooks.reconnect(not response.get("error"), attempts + 1)
+            if not response.get("error"):
+                self.reconnects += 1
+                for payload in list(self._replay.values()):
+                    await self._send(payload)
+                return True
+            if response["error"] == 406 and not await self._reauthenticate():
+                return False
+            attempts += 1
+            if self.max_retries is not None and attempts >= self.max_retries:
+                return False
+            await asyncio.sleep(delay * random.uniform(0.5, 1))  # noqa: S311
+            delay = min(delay * 2, self.max_backoff)
+        return False
+
+    async def _reauthenticate(self) -> bool:
+        # userOnline answers 406 once the access token has expired. Rejected
+        # credentials end the reconnect loop, while an unavailable REST host
+        # only costs this attempt.
+        try:
+            if not await self.http.refresh():
+                await self.http.login()
+        except APIError as error:
+            return self.http.retry.retryable(error)
+        except (CircuitOpen, aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        return True
+
+    def _next_sequence(self) -> str:
+        # Millisecond timestamps collide under bursts, so keep them strictly
+        # increasing to use them as unique keys of the in-flight table.
+        self._last_sequence = max(int(time.time() * 1000), self._last_sequence + 1)
+        return str(self._last_sequence)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def depth(self) -> int:
+        return self._inbox.qsize()
+
+    async def _request(
+        self,
+        payload: dict[str, Any],
+        *,
+        replay: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> Response:
+        if self.limiter:
+            await self.limiter.acquire(payload.get("deviceid", None), priority)
+        if self._closing:
+            # Nothing reconnects a closed client, so waiting would only time out.
+            raise ConnectionError("WebSocket client is closed")
+        sequence = payload["sequence"] = self._next_sequence()
         fut: asyncio.Future[Response] = self.http.loop.create_future()
-        self._futures["update"].append(fut)
-        await self.ws.send_json(
-            {
-                "action": "update",
-                "deviceid": deviceid,
-                "apikey": self.user.api_key,
-                "userAgent": "app",
-                "sequence": str(time.time() * 1000),
-                "params": kwargs,
-            }
+        self._pending[sequence] = fut
+        if replay:
+            self._replay[sequence] = payload
+        if hooks := self.http.hooks:
+            hooks.pending(len(self._pending))
+            start = time.perf_counter()
+        timed_out = False
+        try:
+            async with asyncio.timeout(self.timeout):
+                await self._connected.wait()
+                try:
+                    await self._send(payload)
+                except ConnectionError:
+                    # Replayable requests are re-sent once the socket is back.
+                    if not replay:
+                        raise
+                return await fut
+        except TimeoutError:
+            # The timeout cancels the reply future, so it is recorded here.
+            timed_out = True
+            raise
+        finally:
+            self._pending.pop(sequence, None)
+            self._replay.pop(sequence, None)
+            if hooks:
+                hooks.reply(
+                    payload["action"],
+                    time.perf_counter() - start,
+                    _outcome(fut, timed_out),
+                )
+                hooks.pending(len(self._pending))
+
+    def _resolve(self, msg: dict[str, Any]) -> None:
+        if (sequence := msg.get("sequence", None)) is None:
+            return
+        fut = self._pending.pop(str(sequence), None)
+        self._replay.pop(str(sequence), None)
+        if fut is None or fut.done():
+            return
+        if msg["error"] == 503:
+            fut.set_exception(DeviceOffline("Device is offline."))
+        else:
+            fut.set_result(msg)
+
+    def _cancel_pending(self, *, keep_replay: bool = False) -> None:
+        for sequence, fut in list(self._pending.items()):
+            if keep_replay and sequence in self._replay:
+                continue
+            if not fut.done():
+                fut.set_exception(ConnectionError("WebSocket connection lost"))
+            del self._pending[sequence]
+
+    def add_listener(
+        self,
+        callback: Listener,
+        *,
+        action: str | None = None,
+        deviceid: str | None = None,
+    ) -> None:
+        self._listeners.setdefault((action, deviceid), []).append(callback)
+
+    def remove_listener(
+        self,
+        callback: Listener,
+        *,
+        action: str | None = None,
+        deviceid: str | None = None,
+    ) -> None:
+        if listeners := self._listeners.get((action, deviceid), None):
+            if callback in listeners:
+                listeners.remove(callback)
+            if not listeners:
+                del self._listeners[(action, deviceid)]
+
+    def on(
+        self, action: str | None = None, deviceid: str | None = None
+    ) -> Callable[[Listener], Listener]:
+        def decorator(f: Listener) -> Listener:
+            self.add_listener(f, action=action, deviceid=deviceid)
+            return f
+
+        return decorator
+
+    async def events(
+        self,
+        *,
+        action: str | None = None,
+        deviceid: str | None = None,
+        maxsize: int = 0,
+    ) -> AsyncIterator[Event]:
+        # A bounded stream applies backpressure to the dispatch workers.
+        queue: asyncio.Queue[Event] = asyncio.Queue(maxsize)
+        put = queue.put if maxsize else queue.put_nowait
+        self.add_listener(put, action=action, deviceid=deviceid)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.remove_listener(put, action=action, deviceid=deviceid)
+
+    async def _enqueue(self, msg: dict[str, Any]) -> None:
+        key = (msg["action"], msg.get("deviceid", None))
+        if self.overflow is Overflow.COALESCE:
+            if (queued := self._queued.get(key, None)) is not None:
+                merge_params(
+                    queued.setdefault("params", {}), msg.get("params", None) or {}
+                )
+                self.coalesced += 1
+                return
+        if self.overflow is Overflow.BLOCK:
+            await self._inbox.put(msg)
+        else:
+            if self._inbox.full():
+                self._forget(self._inbox.get_nowait())
+                self._inbox.task_done()
+                self.dropped += 1
+            self._inbox.put_nowait(msg)
+        if self.overflow is Overflow.COALESCE:
+            self._queued[key] = msg
+
+    def _forget(self, msg: dict[str, Any]) -> None:
+        key = (msg["action"], msg.get("deviceid", None))
+        if self._queued.get(key, None) is msg:
+            del self._queued[key]
+
+    async def _work(self) -> None:
+        while True:
+            msg = await self._inbox.get()
+            try:
+                self._forget(msg)
+                await self._dispatch(msg)
+            except Exception as exc:
+                # One malformed push must not stop the worker for good.
+                self.http.loop.call_exception_handler(
+                    {
+                        "message": "Exception in event dispatch",
+                        "exception": exc,
+                    }
+                )
+            finally:
+                self._inbox.task_done()
+
+    def _apply(self, msg: dict[str, Any]) -> DeviceInterface | None:
+        if not self.devices:
+            return None
+        if (device := self.devices.get(msg.get("deviceid", None), None)) is None:
+            return None
+        params: dict[str, Any] = msg.get("params", None) or {}
+        match msg["action"]:
+            case "sysmsg":
+                if "online" in params:
+                    device.online = params["online"]
+            case "update":
+                if params:
+                    device.update(params)
+        self.devices.reindex(device)
+        return device
+
+    async def _dispatch(self, msg: dict[str, Any]) -> None:
+        device = self._apply(msg)
+        if not self._listeners:
+            return
+        await self.emit(
+            Event(
+                action=msg["action"],
+                deviceid=msg.get("deviceid", None),
+                params=msg.get("params", None) or {},
+                data=msg,
+                device=device,
+            )
+        )
+
+    async def emit(self, event: Event) -> None:
+        if not self._listeners:
+            return
+        keys = [(event.action, None), (None, None)]
+        if event.deviceid is not None:
+            keys[:0] = [(event.action, event.deviceid), (None, event.deviceid)]
+        for key in keys:
+            for callback in tuple(self._listeners.get(key, ())):
+                try:
+                    result = callback(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as exc:
+                    self.http.loop.call_exception_handler(
+                        {
+                            "message": "Exception in event listener",
+                            "exception": exc,
+                        }
+                    )
+
+    def _update_payload(self, deviceid: str, params: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "action": "update",
+            "deviceid": deviceid,
+            "apikey": self.user.api_key,
+            "userAgent": "app",
+            "params": params,
+        }
+
+    async def update_device_status(
+        self,
+        deviceid: str,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs: list[dict[str, AnyStr]] | AnyStr,
+    ) -> Response:
+        if window := self.coalesce_windows.get(deviceid, self.coalesce):
+            return await self._coalesce(deviceid, kwargs, window, priority)
+        return await self.update(deviceid, kwargs, priority=priority)
+
+    async def update(
+        self,
+        deviceid: str,
+        params: dict[str, Any],
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Response:
+        return await self._request(
+            self._update_payload(deviceid, params),
+            replay=self.replay,
+            priority=priority,
         )
+
+    async def bulk_update(
+        self,
+        edits: Mapping[str, dict[str, Any]],
+        *,
+        window: int = 64,
+        priority: Priority = Priority.BULK,
+    ) -> AsyncIterator[EditResult]:
+        # At most `window` updates are in flight; results come back as they land.
+        items = iter(edits.items())
+        tasks: set[asyncio.Task[EditResult]] = set()
+        try:
+            while True:
+                while len(tasks) < window and (item := next(items, None)):
+                    tasks.add(self.http.loop.create_task(self._edit(*item, priority)))
+                if not tasks:
+                    return
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                tasks -= done
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _edit(
+        self, deviceid: str, params: dict[str, Any], priority: Priority
+    ) -> EditResult:
         try:
-            result = await asyncio.wait_for(fut, timeout=10)
-        except asyncio.TimeoutError:
-            print("Response timed out")
-            result = None
-        return result
+            response = await self.update(deviceid, params, priority=priority)
+        except DeviceOffline as error:
+            return EditResult(deviceid, EditStatus.OFFLINE, error=error)
+        except TimeoutError as error:
+            return EditResult(deviceid, EditStatus.TIMEOUT, error=error)
+        except (ConnectionError, aiohttp.ClientError) as error:
+            return EditResult(deviceid, EditStatus.ERROR, error=error)
+        if response.get("error"):
+            return EditResult(deviceid, EditStatus.ERROR, response=response)
+        if self.devices is not None and (device := self.devices.get(deviceid)):
+            device.update(params)
+        return EditResult(deviceid, EditStatus.SUCCESS, response=response)
+
+    async def _coalesce(
+        self,
+        deviceid: str,
+        params: dict[str, Any],
+        window: float,
+        priority: Priority,
+    ) -> Response:
+        if (batch := self._batches.get(deviceid, None)) is None:
+            batch = self._batches[deviceid] = _Batch(
+                params={}, future=self.http.loop.create_future(), priority=priority
+            )
+            self.http.loop.call_later(window, self._flush, deviceid)
+        merge_params(batch.params, params)
+        batch.priority = min(batch.priority, priority)
+        # Shielded so that one caller giving up does not cancel the others.
+        return await asyncio.shield(batch.future)
+
+    def _flush(self, deviceid: str) -> None:
+        batch = self._batches.pop(deviceid)
+        fut = batch.future
+        task = self.http.loop.create_task(
+            self._request(
+                self._update_payload(deviceid, batch.params),
+                replay=self.replay,
+                priority=batch.priority,
+            )
+        )
+
+        def done(task: asyncio.Task[Response]) -> None:
+            if fut.done():
+                return
+            if task.cancelled():
+                fut.cancel()
+            elif exc := task.exception():
+                fut.set_exception(exc)
+            else:
+                fut.set_result(task.result())
+
+        task.add_done_callback(done)
 
     async def poll_event(self) -> None:
         try:
-            while self.ws and not self.ws.closed:
-                raw_msg = await self.ws.receive()
-                if raw_msg.type is aiohttp.WSMsgType.TEXT:
-                    msg: dict[str, Any] = raw_msg.json()
-                elif raw_msg.type in (
-                    aiohttp.WSMsgType.CLOSE,
-                    aiohttp.WSMsgType.CLOSING,
-                    aiohttp.WSMsgType.CLOSED,
-                ):
-                    break
-                elif raw_msg.type is aiohttp.WSMsgType.ERROR:
+            while not self._closing:
+                await self._receive()
+                self._connected.clear()
+                self._cancel_pending(keep_replay=self.reconnect)
+                if not self.reconnect or not await self._reconnect():
                     break
-                else:
-                    continue
-                if action := msg.get("action", None):
-                    match action:
-                        case "sysmsg":
-                            if self.devices:
-                                if device := self.devices.get(msg["deviceid"], None):
-                                    device.online = msg["params"]["online"]
-                if "error" in msg and "params" not in msg:
-                    if self._futures["update"]:
-                        match msg["error"]:
-                            case 0:
-                                self._futures["update"][0].set_result(msg)
-                            case 503:
-                                self._futures["update"][0].set_exception(
-                                    DeviceOffline("Device is offline.")
-                                )
-                        self._futures["update"].pop(0)
-                elif "error" in msg and "params" in msg:
-                    if (
-                        not msg["error"]
-                        and "query" in self._futures
-                        and self._futures["query"]
-                    ):
-                        self._futures["query"][0].set_result(msg)
-                        self._futures["query"].pop(0)
         except asyncio.CancelledError:
             raise
         finally:
-            for fut in self._futures.get("update", []):
-                if not fut.done():
-                    fut.cancel()
-            self._futures["update"].clear()
+            self._closing = True
+            for task in (self._ping_task, *self._workers):
+                if task:
+                    task.cancel()
+            self._connected.clear()
+            self._cancel_pending()
+            self._replay.clear()
 
-    async def ping_hb(self) -> None:
+    async def _receive(self) -> None:
+        while self.ws and not self.ws.closed:
+            raw_msg = await self.ws.receive()
+            if raw_msg.type is aiohttp.WSMsgType.TEXT:
+                if raw_msg.data == "pong":
+                    self._pong()
+                    continue
+                if (msg := self._decode(raw_msg.data)) is None:
+                    continue
+                if hooks := self.http.hooks:
+                    hooks.frame("in", msg.get("action", None), len(raw_msg.data))
+            elif raw_msg.type in (
+                aiohttp.WSMsgType.CLOSE,
+                aiohttp.WSMsgType.CLOSING,
+                aiohttp.WSMsgType.CLOSED,
+            ):
+                break
+            elif raw_msg.type is aiohttp.WSMsgType.ERROR:
+                break
+            else:
+                continue
+            if "error" in msg:
+                self._resolve(msg)
+            if "action" in msg:
+                await self._enqueue(msg)
+
+    def _decode(self, data: str) -> dict[str, Any] | None:
         try:
-            while self.ws and not self.ws.closed:
+            msg = self.http.codec.loads(data)
+            if not isinstance(msg, dict):
+                raise ValueError(f"Expected a JSON object: {data}")
+        except ValueError as exc:
+            # One malformed frame must not end the connection.
+            asyncio.get_running_loop().call_exception_handler(
+                {"message": "Invalid WebSocket message", "exception": exc}
+            )
+            return None
+        return msg
+
+    def _pong(self) -> None:
+        if not self._ping_sent:
+            return
+        self.rtt = time.perf_counter() - self._ping_sent
+        self.srtt = self.rtt if self.srtt is None else self.srtt * 0.875 + self.rtt / 8
+        self._ping_sent = 0.0
+        self._pong_received.set()
+        if hooks := self.http.hooks:
+            hooks.heartbeat(self.rtt)
+
+    async def _ping(self) -> bool:
+        self._pong_received.clear()
+        self._ping_sent = time.perf_counter()
+        try:
+            await self.ws.send_str("ping")
+            async with asyncio.timeout(self.pong_timeout):
+                await self._pong_received.wait()
+        except (ConnectionError, TimeoutError):
+            self._ping_sent = 0.0
+            return False
+        return True
+
+    async def ping_hb(self) -> None:
+        while not self._closing:
+            # After a missed pong the link is probed again straight away.
+            if not self.missed_pongs:
                 await asyncio.sleep(self.heartbeat)
-                if self.ws and not self.ws.closed:
-                    await self.ws.send_str("ping")
-        except asyncio.CancelledError:
-            raise
+            if not self.ws or self.ws.closed or not self._connected.is_set():
+                self.missed_pongs = 0
+                continue
+            if await self._ping():
+                self.missed_pongs = 0
+                continue
+            self.missed_pongs += 1
+            if self.missed_pongs >= self.max_missed_pongs:
+                # Closing wakes up _receive, and poll_event then reconnects.
+                self._connected.clear()
+                await self.ws.close()
 
     async def close(self) -> None:
-        tasks = [task for task in (self._ping_task, self._poll_task) if task]
+        self._closing = True
+        tasks = [
+            task for task in (self._ping_task, self._poll_task, *self._workers) if task
+        ]
         for task in tasks:
             task.cancel()
         if tasks:
@@ -165,4 +759,4 @@ class WebSocketClient:
 
     @property
     def closed(self) -> bool:
-        return self.ws.closed
+        return self._closing or self.ws is None
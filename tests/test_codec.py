@@ -0,0 +1,39 @@
+import asyncio
+import importlib.util
+import unittest
+
+from ewelink import Power
+from ewelink.codec import STDLIB, get_codec
+from ewelink.testing import FakeCloud
+
+
+class TestCodec(unittest.IsolatedAsyncioTestCase):
+    async def _codec_roundtrip(self, codec: str) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(codec=codec)
+            await client.login()
+            self.assertEqual(client.http.codec.name, codec)
+            device = client.devices[0]
+            events = client.events(deviceid=device.id)
+            await cloud.push(device.id, {"switch": "on"})
+            await asyncio.wait_for(anext(events), 1)
+            self.assertIs(device.state, Power.on)
+            await events.aclose()
+            await device.off()
+            self.assertEqual(cloud.devices[device.id]["params"]["switch"], "off")
+            await client.close()
+
+    async def test_stdlib_codec(self) -> None:
+        self.assertIs(get_codec("json"), STDLIB)
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+        await self._codec_roundtrip("json")
+
+    @unittest.skipUnless(importlib.util.find_spec("orjson"), "orjson is not installed")
+    async def test_orjson_codec(self) -> None:
+        self.assertEqual(get_codec("auto").name, "orjson")
+        await self._codec_roundtrip("orjson")
+
+
+if __name__ == "__main__":
+    unittest.main()
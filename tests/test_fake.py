@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+
+import ewelink
+from ewelink import Client, EditStatus, Power
+from ewelink.models import Devices
+from ewelink.models.enumerations import Region
+from ewelink.testing import FakeCloud
+
+
+class TestFakeCloud(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.cloud = FakeCloud(devices=25, region="eu")
+        await self.cloud.start()
+        self.client: Client = self.cloud.client()
+        await self.client.login()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.cloud.close()
+
+    async def test_login_follows_region_redirect(self) -> None:
+        self.assertEqual(self.client.region, Region.EU)
+        self.assertEqual(self.cloud.requests["login"], 2)
+        self.assertEqual(len(self.client.devices), 25)
+
+    async def test_edit(self) -> None:
+        device = self.client.devices[0]
+        await device.on()
+        self.assertEqual(device.state, Power.on)
+        self.assertEqual(self.cloud.devices[device.id]["params"]["switch"], "on")
+
+    async def test_push(self) -> None:
+        device = self.client.devices[3]
+        events = self.client.events(deviceid=device.id)
+        await self.cloud.push(device.id, {"switch": "on"})
+        event = await asyncio.wait_for(anext(events), 1)
+        self.assertIs(event.device, device)
+        self.assertEqual(device.state, Power.on)
+        await self.cloud.push(device.id, {"online": False}, "sysmsg")
+        await asyncio.wait_for(anext(events), 1)
+        self.assertFalse(device.online)
+        await events.aclose()
+
+    async def test_offline_device(self) -> None:
+        device = self.client.devices[1]
+        self.cloud.devices[device.id]["online"] = False
+        with self.assertRaises(ewelink.DeviceOffline):
+            await device.on()
+
+    async def test_sync_devices(self) -> None:
+        device, removed = self.client.devices[0], self.client.devices[-1].id
+        self.cloud.devices[device.id]["name"] = "Renamed"
+        self.cloud.add_device(100)
+        del self.cloud.devices[removed]
+        result = await self.client.sync_devices()
+        self.assertEqual([d.id for d in result.added], ["1000000064"])
+        self.assertEqual([d.id for d in result.removed], [removed])
+        self.assertEqual(result.changed, {device.id: {"name": "Renamed"}})
+        self.assertIs(self.client.get_device(device.id), device)
+
+    async def test_bulk_edit(self) -> None:
+        offline = self.client.devices[2].id
+        self.cloud.devices[offline]["online"] = False
+        edits = {device.id: Power.on for device in self.client.devices}
+        edits["missing"] = {"switch": "on"}
+        results = {
+            result.deviceid: result.status
+            async for result in self.client.bulk_edit(edits, window=4)
+        }
+        self.assertEqual(len(results), 26)
+        self.assertEqual(results.pop(offline), EditStatus.OFFLINE)
+        self.assertEqual(results.pop("missing"), EditStatus.ERROR)
+        self.assertEqual(set(results.values()), {EditStatus.SUCCESS})
+        self.assertEqual(self.client.devices[0].state, Power.on)
+
+    async def test_edit_all(self) -> None:
+        devices = Devices(self.client.devices.in_room("room-1"))
+        results = [result async for result in devices.edit_all(Power.on)]
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(device.state is Power.on for device in devices))
+        self.assertTrue(
+            all(self.cloud.devices[d.id]["params"]["switch"] == "on" for d in devices)
+        )
+
+
+class TestFakeCloudOptions(unittest.IsolatedAsyncioTestCase):
+    async def test_pagination(self) -> None:
+        async with FakeCloud(devices=30) as cloud:
+            client = cloud.client(page_size=8)
+            await client.login()
+            self.assertEqual(len(client.devices), 30)
+            self.assertEqual(cloud.requests["devices"], 4)
+            await client.close()
+
+    async def test_multi_channel(self) -> None:
+        async with FakeCloud(devices=2, channels=4) as cloud:
+            client = cloud.client()
+            await client.login()
+            device = client.devices[0]
+            # Indexing stores the channels on the shared Power.on member.
+            self.addCleanup(setattr, Power.on, "channels", ())
+            await device.on[1, 2]()
+            self.assertEqual(
+                [s["switch"] for s in cloud.devices[device.id]["params"]["switches"]],
+                ["off", "on", "on", "off"],
+            )
+            await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from ewelink import Gateway, GatewayCache
+from ewelink.testing import FakeCloud
+from ewelink.ws import WebSocketClient
+
+
+class TestGateway(unittest.IsolatedAsyncioTestCase):
+    async def test_gateway_failover(self) -> None:
+        async with FakeCloud(devices=2) as cloud, FakeCloud() as other:
+            client = cloud.client()
+            client.gateways.add(Gateway(other.host, other.port, latency=0.001))
+            client.gateways.add(Gateway(cloud.host, cloud.port, latency=0.01))
+            other.reject()
+            await client.login()
+            self.assertEqual(client.gateway.port, cloud.port)
+            self.assertEqual(client.gateways.get(other.host, other.port).failures, 1)
+            client.ws.backoff = 0.01
+            await cloud.drop()
+            async with asyncio.timeout(2):
+                while not client.ws.reconnects:
+                    await asyncio.sleep(0.01)
+            # Both the login and the reconnect are served from the cache.
+            self.assertEqual(cloud.requests["dispatch"], 0)
+            self.assertEqual(other.requests["websocket"], 1)
+            self.assertEqual(cloud.requests["websocket"], 2)
+            await client.close()
+
+    async def test_failed_handshake_closes_socket(self) -> None:
+        async def garbled(request: web.Request) -> web.WebSocketResponse:
+            # Accepts the upgrade but answers userOnline with garbage.
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await ws.receive()
+            await ws.send_str("not json")
+            async for _ in ws:
+                pass
+            return ws
+
+        app = web.Application()
+        app.router.add_get("/api/ws", garbled)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            ws = WebSocketClient(client.http, client.user, gateways=client.gateways)
+            ws.domain, ws.port = runner.addresses[0][:2]
+            with self.assertRaises(ConnectionError):
+                await ws._connect()
+            self.assertTrue(ws.ws.closed)
+            await client.close()
+        await runner.cleanup()
+
+    async def test_shared_cache(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            gateways = GatewayCache()
+            first = cloud.client(gateways=gateways)
+            second = cloud.client("password", "other@example.com", gateways=gateways)
+            await first.login()
+            await second.login()
+            self.assertEqual(cloud.requests["dispatch"], 1)
+            self.assertEqual(len(gateways), 1)
+            await first.close()
+            await second.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import importlib.util
+import unittest
+from typing import Any
+
+from ewelink import Hooks, OpenTelemetryHooks
+from ewelink.testing import FakeCloud
+
+
+class TestHooks(unittest.IsolatedAsyncioTestCase):
+    async def test_hooks(self) -> None:
+        calls: list[tuple[str, ...]] = []
+
+        class Recorder(Hooks):
+            def request_end(
+                self, endpoint: str, context: Any, *, status: int | None, **_: Any
+            ) -> None:
+                calls.append(("request", endpoint, status))
+
+            def reply(self, action: str, duration: float, outcome: str) -> None:
+                calls.append(("reply", action, outcome))
+
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(hooks=Recorder())
+            await client.login()
+            await client.devices[0].on()
+            await client.close()
+        self.assertEqual(
+            calls,
+            [
+                ("request", "login", 200),
+                ("request", "gateway", 200),
+                ("request", "devices", 200),
+                ("reply", "update", "ok"),
+            ],
+        )
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("opentelemetry.sdk"), "opentelemetry is not installed"
+    )
+    def test_opentelemetry_spans(self) -> None:
+        from opentelemetry.sdk.trace import TracerProvider  # noqa: PLC0415
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: PLC0415
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # noqa: PLC0415
+            InMemorySpanExporter,
+        )
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        hooks = OpenTelemetryHooks(provider.get_tracer("test"))
+        hooks.reconnect(False, 1)
+        hooks.heartbeat(0.01)
+        reconnect, heartbeat = exporter.get_finished_spans()
+        self.assertEqual(reconnect.name, "ewelink ws reconnect")
+        self.assertEqual(reconnect.attributes["ewelink.attempt"], 1)
+        self.assertEqual(heartbeat.name, "ewelink ws heartbeat")
+        self.assertAlmostEqual(
+            (heartbeat.end_time - heartbeat.start_time) / 1e9, 0.01, places=6
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import importlib.util
+import json
+import unittest
+from typing import Any
+
+from aiohttp import web
+
+from ewelink import LanTransport
+from ewelink.lan import decrypt
+from ewelink.testing import FakeCloud
+
+
+class TestLan(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.cloud = FakeCloud(devices=2)
+        await self.cloud.start()
+        # A stand-in for the device's own zeroconf HTTP server.
+        self.received: list[dict[str, Any]] = []
+        self.html = False
+        app = web.Application()
+        app.router.add_post("/zeroconf/{command}", self._zeroconf)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.lan = LanTransport()
+        self.client = self.cloud.client(lan=self.lan)
+        await self.client.login()
+        self.device = self.client.devices[0]
+        self.lan.add(self.device.id, "127.0.0.1", self.runner.addresses[0][1])
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.runner.cleanup()
+        await self.cloud.close()
+
+    async def _zeroconf(self, request: web.Request) -> web.Response:
+        self.received.append(await request.json())
+        if self.html:
+            return web.Response(text="<html>Bad Gateway</html>", status=502)
+        return web.json_response({"seq": 1, "error": 0})
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("cryptography"), "cryptography is not installed"
+    )
+    async def test_encrypted_command(self) -> None:
+        await self.device.off()
+        self.assertEqual(self.cloud.requests["update"], 0)
+        [payload] = self.received
+        self.assertTrue(payload["encrypt"])
+        data = json.loads(
+            decrypt(
+                payload["data"],
+                payload["iv"],
+                self.cloud.devices[self.device.id]["devicekey"],
+            )
+        )
+        self.assertEqual(data["switch"], "off")
+
+    async def test_fallback_to_cloud(self) -> None:
+        self.html = True
+        self.cloud.devices[self.device.id]["params"]["switch"] = "on"
+        await self.device.off()
+        self.assertEqual(self.cloud.requests["update"], 1)
+        self.assertEqual(self.cloud.devices[self.device.id]["params"]["switch"], "off")
+        self.assertFalse(self.lan.reachable(self.device.id))
+        await self.device.off()
+        self.assertEqual(len(self.received), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from ewelink import Client, Object
+from ewelink.testing import FakeCloud
+
+
+class TestDevices(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.cloud = FakeCloud(devices=16)
+        await self.cloud.start()
+        self.client: Client = self.cloud.client()
+        await self.client.login()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.cloud.close()
+
+    async def test_sysmsg_reindexes_online(self) -> None:
+        devices, device = self.client.devices, self.client.devices[0]
+        self.assertEqual(devices.offline(), [])
+        events = self.client.events(deviceid=device.id)
+        await self.cloud.push(device.id, {"online": False}, "sysmsg")
+        await asyncio.wait_for(anext(events), 1)
+        await events.aclose()
+        self.assertEqual(devices.offline(), [device])
+        self.assertNotIn(device, devices.online())
+        self.assertEqual(len(devices.online()), 15)
+
+    async def test_sync_reindexes_room(self) -> None:
+        devices, device = self.client.devices, self.client.devices[1]
+        self.cloud.devices[device.id]["family"]["roomid"] = "room-9"
+        await self.client.sync_devices()
+        self.assertEqual(devices.in_room("room-9"), [device])
+        self.assertNotIn(device, devices.in_room("room-1"))
+        self.assertEqual(len(devices.in_room("room-1")), 1)
+
+    async def test_filter(self) -> None:
+        devices = self.client.devices
+        first, second = devices[1], devices[9]
+        self.assertEqual(devices.filter(room="room-1"), [first, second])
+        self.cloud.devices[second.id]["online"] = False
+        await self.client.sync_devices()
+        self.assertEqual(devices.filter(room="room-1", online=True), [first])
+        self.assertEqual(devices.filter(room="room-1", online=False), [second])
+        self.assertEqual(devices.filter(room="room-2", brand="missing"), [])
+        self.assertEqual(len(devices.filter()), 16)
+
+
+class TestObject(unittest.TestCase):
+    def test_writes_through(self) -> None:
+        data = {"switch": "off"}
+        params = Object(data)
+        self.assertEqual(params.switch, "off")
+        params.switch = "on"
+        params.startup = "stay"
+        self.assertEqual(data, {"switch": "on", "startup": "stay"})
+        del params.startup
+        self.assertNotIn("startup", data)
+
+    def test_merge_switches_by_outlet(self) -> None:
+        params = Object(
+            {
+                "switches": [
+                    {"switch": "off", "outlet": 0},
+                    {"switch": "off", "outlet": 1},
+                ]
+            }
+        )
+        params.merge({"switches": [{"switch": "on", "outlet": 1}], "startup": "on"})
+        self.assertEqual(
+            params.switches,
+            [{"switch": "off", "outlet": 0}, {"switch": "on", "outlet": 1}],
+        )
+        self.assertEqual(params.startup, "on")
+
+    def test_missing_key(self) -> None:
+        params = Object({})
+        with self.assertRaises(AttributeError):
+            params.switch  # noqa: B018
+        with self.assertRaises(AttributeError):
+            del params.switch
+        self.assertFalse(hasattr(params, "switch"))
+
+
+if __name__ == "__main__":
+    unittest.main()
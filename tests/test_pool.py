@@ -0,0 +1,65 @@
+import asyncio
+import contextlib
+import unittest
+
+from ewelink import ClientPool, Hooks, Power, RateLimiter
+from ewelink.testing import FakeCloud
+
+
+class TestClientPool(unittest.IsolatedAsyncioTestCase):
+    async def test_routing_and_events(self) -> None:
+        async with FakeCloud(devices=1) as first, FakeCloud(devices=0) as second:
+            second.add_device(100)
+            pool = ClientPool(2, limiter=lambda: RateLimiter(100))
+            pool.add("password", "a@example.com", endpoints=first.endpoints)
+            pool.add("password", "b@example.com", endpoints=second.endpoints)
+            async with pool:
+                self.assertEqual(pool.account("1000000064"), "b@example.com")
+                await pool.edit("1000000064", Power.on)
+                self.assertEqual(second.devices["1000000064"]["params"]["switch"], "on")
+                self.assertEqual(first.devices["1000000000"]["params"]["switch"], "off")
+                a, b = (
+                    pool.get_client(key) for key in ("a@example.com", "b@example.com")
+                )
+                self.assertIsNot(a.http.limiter, b.http.limiter)
+
+                received: list[tuple[str, str | None]] = []
+
+                async def collect() -> None:
+                    async with contextlib.aclosing(pool.events()) as events:
+                        async for key, event in events:
+                            received.append((key, event.deviceid))
+                            if len(received) == 2:
+                                return
+
+                task = asyncio.create_task(collect())
+                await asyncio.sleep(0)
+                await first.push("1000000000", {"switch": "on"})
+                await second.push("1000000064", {"switch": "off"})
+                await asyncio.wait_for(task, 2)
+                self.assertCountEqual(
+                    received,
+                    [("a@example.com", "1000000000"), ("b@example.com", "1000000064")],
+                )
+
+    async def test_shard_shares_gateways(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            pool = ClientPool(1)
+            pool.add("password", "a@example.com", endpoints=cloud.endpoints)
+            pool.add("password", "b@example.com", endpoints=cloud.endpoints)
+            async with pool:
+                a, b = (
+                    pool.get_client(key) for key in ("a@example.com", "b@example.com")
+                )
+                self.assertIs(a.gateways, b.gateways)
+                self.assertEqual(len(a.gateways), 1)
+
+    def test_rejects_shared_instances(self) -> None:
+        with self.assertRaises(TypeError):
+            ClientPool(limiter=RateLimiter(10))
+        with self.assertRaises(TypeError):
+            ClientPool().add("password", "a@example.com", hooks=Hooks())
+
+
+if __name__ == "__main__":
+    unittest.main()
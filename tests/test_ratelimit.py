@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from ewelink import Priority, RateLimiter
+from ewelink.testing import FakeCloud
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_interactive_before_bulk(self) -> None:
+        limiter = RateLimiter(50, 1)
+        await limiter.acquire()
+        order: list[Priority] = []
+
+        async def acquire(priority: Priority) -> None:
+            await limiter.acquire(priority=priority)
+            order.append(priority)
+
+        await asyncio.gather(
+            acquire(Priority.BULK),
+            acquire(Priority.BULK),
+            acquire(Priority.INTERACTIVE),
+        )
+        self.assertEqual(order, [Priority.INTERACTIVE, Priority.BULK, Priority.BULK])
+        self.assertEqual(limiter.acquired[Priority.BULK], 2)
+
+    async def test_device_budget(self) -> None:
+        limiter = RateLimiter(1000, device_rate=10, device_burst=1)
+        self.assertLess(await limiter.acquire("a"), 0.05)
+        self.assertLess(await limiter.acquire("b"), 0.05)
+        self.assertGreaterEqual(await limiter.acquire("a"), 0.05)
+
+    async def test_client_limiter(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            limiter = RateLimiter(1000, device_rate=10, device_burst=1)
+            client = cloud.client(limiter=limiter)
+            await client.login()
+            device = client.devices[0]
+            await device.on()
+            await device.off()
+            self.assertGreater(limiter.queued_time[Priority.INTERACTIVE], 0.05)
+            await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from ewelink import (
+    APIError,
+    CircuitBreaker,
+    CircuitOpen,
+    Client,
+    Endpoints,
+    RetryPolicy,
+)
+from ewelink.testing import FakeCloud
+
+
+class TestRetry(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_errors(self) -> None:
+        async with FakeCloud(error_rate=0.3, seed=1) as cloud:
+            client = cloud.client(retry=RetryPolicy(retries=10, backoff=0.001))
+            await client.login()
+            self.assertEqual(len(client.devices), 10)
+            await client.close()
+
+    async def test_html_error_page(self) -> None:
+        async with FakeCloud() as cloud:
+            client = Client(
+                "password",
+                "user@example.com",
+                endpoints=Endpoints(api=cloud.url + "/missing/{region}/api"),
+            )
+            with self.assertRaises(APIError) as raised:
+                await client.login()
+            self.assertEqual(raised.exception.code, 404)
+            await client.close()
+
+    def test_half_open_allows_one_trial(self) -> None:
+        breaker = CircuitBreaker(threshold=1, reset=0)
+        breaker.failure()
+        breaker.check("host")
+        with self.assertRaises(CircuitOpen):
+            breaker.check("host")
+        breaker.failure()
+        breaker.check("host")
+        breaker.success()
+        breaker.check("host")
+        breaker.check("host")
+
+
+if __name__ == "__main__":
+    unittest.main()
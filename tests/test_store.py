@@ -0,0 +1,68 @@
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ewelink import FileCredentialStore, MemoryCredentialStore
+from ewelink.testing import FakeCloud
+
+
+class TestCredentialStore(unittest.IsolatedAsyncioTestCase):
+    def test_file_store_concurrent_saves(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileCredentialStore(Path(directory) / "credentials.json")
+            with ThreadPoolExecutor(8) as executor:
+                for index in range(32):
+                    executor.submit(asyncio.run, store.save(str(index), {"at": index}))
+            self.assertEqual(len(store._read()), 32)
+
+    async def test_resume_refreshes_expired_token(self) -> None:
+        store = MemoryCredentialStore()
+        async with FakeCloud() as cloud:
+            client = cloud.client(store=store)
+            await client.login()
+            await client.close()
+            cloud.expire_tokens()
+            client = cloud.client(store=store)
+            await client.login()
+            self.assertEqual(cloud.requests["login"], 1)
+            self.assertEqual(cloud.requests["refresh"], 1)
+            self.assertEqual(cloud.requests["dispatch"], 1)
+            await client.close()
+
+    async def test_resume_keeps_token_age(self) -> None:
+        store = MemoryCredentialStore()
+        async with FakeCloud() as cloud:
+            client = cloud.client(store=store)
+            await client.login()
+            await client.close()
+            issued = (await store.load("user@example.com"))["issued"]
+            client = cloud.client(store=store)
+            await client.login()
+            await client.close()
+            self.assertEqual((await store.load("user@example.com"))["issued"], issued)
+            client = cloud.client(store=store, token_ttl=0)
+            await client.login()
+            await client.close()
+            self.assertGreater((await store.load("user@example.com"))["issued"], issued)
+            self.assertEqual(cloud.requests["refresh"], 1)
+
+    async def test_resume_reads_saved_key(self) -> None:
+        store = MemoryCredentialStore()
+        async with FakeCloud() as cloud:
+            client = cloud.client(store=store)
+            await client.login()
+            await client.close()
+            credentials = await store.load("user@example.com")
+            credentials["saved"] = credentials.pop("issued")
+            await store.save("user@example.com", credentials)
+            client = cloud.client(store=store)
+            await client.login()
+            await client.close()
+            self.assertEqual(client.http.issued, credentials["saved"])
+            self.assertEqual(cloud.requests["login"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+from datetime import UTC, datetime
+
+from ewelink.utils import parse_timestamp
+
+
+class TestParseTimestamp(unittest.TestCase):
+    def test_utc(self) -> None:
+        timestamp = parse_timestamp("2020-01-02T03:04:05.000Z")
+        self.assertEqual(timestamp, datetime(2020, 1, 2, 3, 4, 5, tzinfo=UTC))
+        self.assertIs(timestamp.tzinfo, UTC)
+
+    def test_offset(self) -> None:
+        timestamp = parse_timestamp("2020-01-02T05:04:05.250+02:00")
+        self.assertEqual(timestamp, datetime(2020, 1, 2, 3, 4, 5, 250000, tzinfo=UTC))
+        self.assertIs(timestamp.tzinfo, UTC)
+
+    def test_naive(self) -> None:
+        timestamp = parse_timestamp("2020-01-02T03:04:05")
+        self.assertEqual(timestamp, datetime(2020, 1, 2, 3, 4, 5, tzinfo=UTC))
+
+
+if __name__ == "__main__":
+    unittest.main()
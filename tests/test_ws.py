@@ -0,0 +1,282 @@
+import asyncio
+import json
+import unittest
+from typing import Any, Callable
+
+from ewelink import Hooks, Overflow, Power, RetryPolicy
+from ewelink.models import Device
+from ewelink.testing import FakeCloud
+
+
+class TestInbox(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.cloud = FakeCloud(devices=2)
+        await self.cloud.start()
+        self.gate = asyncio.Event()
+
+    async def asyncTearDown(self) -> None:
+        self.gate.set()
+        await self.client.close()
+        await self.cloud.close()
+
+    async def hold(self, overflow: Overflow) -> Device:
+        self.client = self.cloud.client(overflow=overflow, queue_size=2)
+        await self.client.login()
+        # The first push holds the only worker until the gate opens.
+        self.client.ws.add_listener(lambda event: self.gate.wait())
+        device = self.client.devices[0]
+        await self.cloud.push(device.id, {"switch": "on"})
+        await self.until(lambda: device.state is Power.on)
+        return device
+
+    async def until(self, predicate: Callable[[], bool]) -> None:
+        async with asyncio.timeout(1):
+            while not predicate():
+                await asyncio.sleep(0.01)
+
+    async def test_drop_oldest(self) -> None:
+        device = await self.hold(Overflow.DROP_OLDEST)
+        await self.cloud.push(device.id, {"startup": "on"})
+        await self.cloud.push(device.id, {"pulse": "on"})
+        await self.cloud.push(device.id, {"pulseWidth": 1000})
+        await self.until(lambda: self.client.ws.dropped == 1)
+        self.gate.set()
+        await self.until(lambda: device.pulse.width == 1000)
+        self.assertIs(device.startup, Power.off)
+        self.assertIs(device.pulse.state, Power.on)
+
+    async def test_coalesce(self) -> None:
+        device = await self.hold(Overflow.COALESCE)
+        await self.cloud.push(device.id, {"startup": "on"})
+        await self.cloud.push(device.id, {"pulse": "on"})
+        await self.until(lambda: self.client.ws.coalesced == 1)
+        self.assertEqual(self.client.ws.depth, 1)
+        self.gate.set()
+        await self.until(lambda: self.client.ws.depth == 0)
+        await self.until(lambda: device.pulse.state is Power.on)
+        self.assertIs(device.startup, Power.on)
+
+    async def test_block(self) -> None:
+        device = await self.hold(Overflow.BLOCK)
+        await self.cloud.push(device.id, {"startup": "on"})
+        await self.cloud.push(device.id, {"pulse": "on"})
+        await self.cloud.push(device.id, {"pulseWidth": 1000})
+        await self.until(lambda: self.client.ws.depth == 2)
+        self.gate.set()
+        await self.until(lambda: device.pulse.width == 1000)
+        self.assertIs(device.startup, Power.on)
+        self.assertEqual(self.client.ws.dropped, 0)
+
+
+class TestWebSocket(unittest.IsolatedAsyncioTestCase):
+    async def test_replies_out_of_order(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            cloud.stall()
+            deviceids = [device.id for device in client.devices]
+            tasks = [
+                asyncio.create_task(client.ws.update(deviceid, {"switch": "on"}))
+                for deviceid in deviceids
+            ]
+            async with asyncio.timeout(1):
+                while client.ws.pending < 2:
+                    await asyncio.sleep(0.01)
+            cloud.resume()
+            sequences = list(client.ws._pending)
+            for sequence, deviceid in reversed(
+                list(zip(sequences, deviceids, strict=True))
+            ):
+                await cloud.broadcast(
+                    json.dumps({"error": 0, "sequence": sequence, "deviceid": deviceid})
+                )
+            replies = await asyncio.wait_for(asyncio.gather(*tasks), 1)
+            self.assertEqual([reply["deviceid"] for reply in replies], deviceids)
+            self.assertEqual(client.ws.pending, 0)
+            await client.close()
+
+    async def test_timeout_clears_pending(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            client.ws.timeout = 0.05
+            cloud.stall()
+            with self.assertRaises(TimeoutError):
+                await client.devices[0].off()
+            self.assertEqual(client.ws.pending, 0)
+            await client.close()
+
+    async def test_relogin_keeps_listeners(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            device = client.devices[0]
+            seen: list[str] = []
+            client.ws.add_listener(lambda event: seen.append(event.action))
+            events = client.events(deviceid=device.id)
+            pending = asyncio.ensure_future(anext(events))
+            await asyncio.sleep(0)
+            await client.login()
+            await cloud.push(device.id, {"switch": "on"})
+            event = await asyncio.wait_for(pending, 1)
+            self.assertEqual(event.deviceid, device.id)
+            self.assertEqual(seen, ["update"])
+            await events.aclose()
+            await client.close()
+
+    async def test_coalesce_edits(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(coalesce=0.05)
+            await client.login()
+            params = cloud.devices[client.devices[0].id]["params"]
+            first, second = await asyncio.gather(
+                client.ws.update_device_status(client.devices[0].id, switch="on"),
+                client.ws.update_device_status(client.devices[0].id, startup="on"),
+            )
+            self.assertIs(first, second)
+            self.assertEqual(cloud.requests["update"], 1)
+            self.assertEqual((params["switch"], params["startup"]), ("on", "on"))
+            await client.close()
+
+    async def test_edit_timeout(self) -> None:
+        outcomes: list[str] = []
+
+        class Recorder(Hooks):
+            def reply(self, action: str, duration: float, outcome: str) -> None:
+                outcomes.append(outcome)
+
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(hooks=Recorder())
+            await client.login()
+            client.ws.timeout = 0.05
+            cloud.stall()
+            with self.assertRaises(TimeoutError):
+                await client.devices[0].off()
+            self.assertEqual(outcomes, ["timeout"])
+            await client.close()
+
+    async def test_missed_pongs_reconnect(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(heartbeat=0.05, pong_timeout=0.05)
+            await client.login()
+            await asyncio.sleep(0.1)
+            self.assertIsNotNone(client.ws.rtt)
+            cloud.stall()
+            async with asyncio.timeout(2):
+                while not client.ws.reconnects:
+                    await asyncio.sleep(0.01)
+            await client.devices[0].on()
+            self.assertEqual(cloud.requests["websocket"], 2)
+            await client.close()
+
+    async def test_reconnect_after_rejected_handshake(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            client.ws.backoff = 0.01
+            cloud.reject()
+            await cloud.drop()
+            async with asyncio.timeout(2):
+                while not client.ws.reconnects:
+                    await asyncio.sleep(0.01)
+            await client.devices[0].on()
+            self.assertEqual(cloud.requests["websocket"], 3)
+            await client.close()
+
+    async def test_reconnect_refreshes_expired_token(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            cloud.expire_tokens()
+            await cloud.drop()
+            async with asyncio.timeout(2):
+                while not client.ws.reconnects:
+                    await asyncio.sleep(0.01)
+            self.assertEqual(cloud.requests["refresh"], 1)
+            self.assertEqual(cloud.requests["userOnline"], 3)
+            await client.close()
+
+    async def test_disconnect_fails_pending_requests(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            cloud.stall()
+            task = asyncio.create_task(client.devices[0].on())
+            await asyncio.sleep(0.05)
+            await cloud.drop()
+            with self.assertRaises(ConnectionError):
+                await task
+            self.assertFalse(task.cancelled())
+            await client.close()
+
+    async def test_reconnect_outlasts_rest_outage(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(retry=RetryPolicy(retries=0))
+            await client.login()
+            client.ws.backoff = 0.01
+            cloud.expire_tokens()
+            client.http.BASE = "http://127.0.0.1:1/api"
+            await cloud.drop()
+            async with asyncio.timeout(2):
+                while cloud.requests["userOnline"] < 3:
+                    await asyncio.sleep(0.01)
+            self.assertFalse(client.ws.closed)
+            client.http.set_region(client.http.region)
+            async with asyncio.timeout(2):
+                while not client.ws.reconnects:
+                    await asyncio.sleep(0.01)
+            await client.devices[0].off()
+            await client.close()
+
+    async def test_closed_client_fails_fast(self) -> None:
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client(reconnect=False)
+            await client.login()
+            await cloud.drop()
+            async with asyncio.timeout(1):
+                while not client.ws.closed:
+                    await asyncio.sleep(0.01)
+                with self.assertRaises(ConnectionError):
+                    await client.devices[0].off()
+            await client.close()
+
+    async def test_malformed_frame_keeps_connection(self) -> None:
+        errors: list[dict[str, Any]] = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            device = client.devices[0]
+            await cloud.broadcast("not json")
+            await cloud.broadcast("[1]")
+            await cloud.push(device.id, {"startup": "on"})
+            async with asyncio.timeout(1):
+                while device.startup is not Power.on:
+                    await asyncio.sleep(0.01)
+            self.assertEqual(len(errors), 2)
+            self.assertFalse(client.ws.closed)
+            await client.close()
+
+    async def test_bad_push_keeps_worker(self) -> None:
+        errors: list[dict[str, Any]] = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        async with FakeCloud(devices=2) as cloud:
+            client = cloud.client()
+            await client.login()
+            device = client.devices[1]
+            await cloud.push(device.id, {"switch": "bogus"})
+            await cloud.push(device.id, {"switch": "on"})
+            async with asyncio.timeout(1):
+                while device.state is not Power.on:
+                    await asyncio.sleep(0.01)
+            self.assertEqual(client.ws.depth, 0)
+            self.assertIsInstance(errors[0]["exception"], KeyError)
+            await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()